@@ -0,0 +1,60 @@
+"""Add course_roster and instructor_load count tables
+
+Revision ID: 0b4d7e2a9c15
+Revises: c71d4e0f9a28
+Create Date: 2026-10-18 14:02:37.415260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b4d7e2a9c15'
+down_revision: Union[str, None] = 'c71d4e0f9a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Enrolled students per course and term, maintained with enrollment changes
+    op.create_table(
+        'course_roster',
+        sa.Column('course_id', sa.Integer, sa.ForeignKey('course.id'), primary_key=True, nullable=False),
+        sa.Column('term', sa.String, primary_key=True, nullable=False),
+        sa.Column('sy', sa.String, primary_key=True, nullable=False),
+        sa.Column('students', sa.Integer, nullable=False)
+    )
+    # Courses and students taught per instructor and term
+    op.create_table(
+        'instructor_load',
+        sa.Column('instructor_id', sa.Integer, sa.ForeignKey('instructor.id'), primary_key=True, nullable=False),
+        sa.Column('term', sa.String, primary_key=True, nullable=False),
+        sa.Column('sy', sa.String, primary_key=True, nullable=False),
+        sa.Column('courses', sa.Integer, nullable=False),
+        sa.Column('students', sa.Integer, nullable=False)
+    )
+    op.create_index('ix_enroll_course_id', 'enroll', ['course_id'])
+    op.create_index('ix_teach_course_id', 'teach', ['course_id'])
+
+    # Backfill from the existing rows
+    op.execute(
+        "INSERT INTO course_roster (course_id, term, sy, students) "
+        "SELECT course_id, term, sy, count(*) FROM enroll GROUP BY course_id, term, sy"
+    )
+    op.execute(
+        "INSERT INTO instructor_load (instructor_id, term, sy, courses, students) "
+        "SELECT teach.instructor_id, teach.term, teach.sy, count(*), coalesce(sum(course_roster.students), 0) "
+        "FROM teach LEFT OUTER JOIN course_roster ON course_roster.course_id = teach.course_id "
+        "AND course_roster.term = teach.term AND course_roster.sy = teach.sy "
+        "GROUP BY teach.instructor_id, teach.term, teach.sy"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_teach_course_id', table_name='teach')
+    op.drop_index('ix_enroll_course_id', table_name='enroll')
+    op.drop_table('instructor_load')
+    op.drop_table('course_roster')
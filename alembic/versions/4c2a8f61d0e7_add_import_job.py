@@ -0,0 +1,42 @@
+"""Add import_job
+
+Revision ID: 4c2a8f61d0e7
+Revises: 9e1f5c3b7a20
+Create Date: 2026-10-18 18:05:12.447019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c2a8f61d0e7'
+down_revision: Union[str, None] = '9e1f5c3b7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Import job status, readable from every worker
+    op.create_table(
+        'import_job',
+        sa.Column('id', sa.String, primary_key=True),
+        sa.Column('target', sa.String, nullable=False),
+        sa.Column('status', sa.String, nullable=False),
+        sa.Column('rows_processed', sa.Integer, nullable=False),
+        sa.Column('rows_loaded', sa.Integer, nullable=False),
+        sa.Column('rows_failed', sa.Integer, nullable=False),
+        sa.Column('progress', sa.Float, nullable=False),
+        sa.Column('errors', sa.JSON, nullable=False),
+        sa.Column('detail', sa.String, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_import_job_created_at', 'import_job', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_job_created_at', table_name='import_job')
+    op.drop_table('import_job')
@@ -0,0 +1,27 @@
+"""Add answer to test_answer
+
+Revision ID: 5e8f2b6a1c93
+Revises: a3c9e1d4b7f2
+Create Date: 2026-10-18 10:03:12.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8f2b6a1c93'
+down_revision: Union[str, None] = 'a3c9e1d4b7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Store the submitted answer so it can be scored against test_item.answer
+    op.add_column('test_answer', sa.Column('answer', sa.String, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('test_answer', 'answer')
@@ -0,0 +1,33 @@
+"""Add version and updated_at to entity tables
+
+Revision ID: 9e1f5c3b7a20
+Revises: 0b4d7e2a9c15
+Create Date: 2026-10-18 16:20:51.093348
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f5c3b7a20'
+down_revision: Union[str, None] = '0b4d7e2a9c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('acad_program', 'student', 'course', 'lesson', 'instructor', 'test', 'test_item')
+
+
+def upgrade() -> None:
+    # Row versions for ETag / If-Match; existing rows start at version 1
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer, nullable=False, server_default=sa.text('1')))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()))
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
@@ -0,0 +1,47 @@
+"""Add test_id to construct
+
+Revision ID: a3c9e1d4b7f2
+Revises: f86bcc3f5c40
+Create Date: 2026-10-18 09:12:40.218334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1d4b7f2'
+down_revision: Union[str, None] = 'f86bcc3f5c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Link each constructed item to the test it was written for
+    op.add_column('construct', sa.Column('test_id', sa.Integer, sa.ForeignKey('test.id'), nullable=True))
+    op.create_index('ix_construct_test_id', 'construct', ['test_id'])
+    # Backfill from the links that existed before: the item's lessons (lesson_make), the
+    # tests drawn from those lessons (lesson_from), restricted to tests created by the
+    # item's author (test_create). Where that matches several tests the lowest id is
+    # taken; items matching none keep a NULL test_id and appear in no assessment until
+    # linked by hand.
+    op.execute(
+        '''
+        UPDATE construct SET test_id = (
+            SELECT MIN(lesson_from.test_id)
+            FROM lesson_make
+            JOIN lesson_from ON lesson_from.lesson_id = lesson_make.lesson_id
+            JOIN test_create ON test_create.test_id = lesson_from.test_id
+                AND test_create.instructor_id = construct.instructor_id
+            WHERE lesson_make.test_item_id = construct.test_item_id
+        )
+        WHERE test_id IS NULL
+        '''
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_construct_test_id', table_name='construct')
+    op.drop_column('construct', 'test_id')
@@ -0,0 +1,35 @@
+"""Add test_score summary table
+
+Revision ID: c71d4e0f9a28
+Revises: 5e8f2b6a1c93
+Create Date: 2026-10-18 11:41:05.778120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d4e0f9a28'
+down_revision: Union[str, None] = '5e8f2b6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-student score of each test, maintained as answers arrive
+    op.create_table(
+        'test_score',
+        sa.Column('test_id', sa.Integer, sa.ForeignKey('test.id'), primary_key=True, nullable=False),
+        sa.Column('student_id', sa.Integer, sa.ForeignKey('student.id'), primary_key=True, nullable=False),
+        sa.Column('correct', sa.Integer, nullable=False),
+        sa.Column('answered', sa.Integer, nullable=False)
+    )
+    op.create_index('ix_test_answer_test_item_id', 'test_answer', ['test_item_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_test_answer_test_item_id', table_name='test_answer')
+    op.drop_table('test_score')
@@ -0,0 +1,41 @@
+import argparse
+import time
+
+import httpx
+
+from .common import serve
+
+# Answers/sec: one POST per answer (/test_items/{id}/answer) versus one answer sheet
+# per student (/assessments/{test_id}/answers). Needs existing students and a test
+# whose items are linked through construct.test_id.
+# Usage: python -m benchmarks.bench_answers --student-ids 1-200 --test-id 1 --item-ids 1-50
+
+def id_range(value):
+    start, _, end = value.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--student-ids", type=id_range, required=True)
+    parser.add_argument("--test-id", type=int, required=True)
+    parser.add_argument("--item-ids", type=id_range, required=True)
+    args = parser.parse_args()
+
+    total = len(args.student_ids) * len(args.item_ids)
+    with serve() as base_url, httpx.Client(base_url=base_url, timeout=60) as client:
+        started = time.perf_counter()
+        for student_id in args.student_ids:
+            for item_id in args.item_ids:
+                client.post(f"/students/{student_id}/test_items/{item_id}/answer", params={"term": "1", "sy": "bench", "answer": "a"})
+        elapsed = time.perf_counter() - started
+        print(f"{'per-item POST':<20} {total / elapsed:>10.1f} answers/s  ({total} requests)")
+
+        started = time.perf_counter()
+        for student_id in args.student_ids:
+            sheet = {"term": "1", "sy": "bench", "answers": [{"test_item_id": item_id, "answer": "b"} for item_id in args.item_ids]}
+            client.post(f"/students/{student_id}/assessments/{args.test_id}/answers", json=sheet)
+        elapsed = time.perf_counter() - started
+        print(f"{'answer sheet POST':<20} {total / elapsed:>10.1f} answers/s  ({len(args.student_ids)} requests)")
+
+if __name__ == "__main__":
+    main()
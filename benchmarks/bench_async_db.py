@@ -0,0 +1,21 @@
+import argparse
+
+from .common import serve, run_load, report
+
+# Compare requests/sec of the sync (threadpool) and async (AsyncEngine) database modes
+# Usage: python -m benchmarks.bench_async_db --path /admins/faculty --concurrency 200
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/admins/faculty")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    for label, env in (("sync (DB_ASYNC=false)", {"DB_ASYNC": "false"}), ("async (DB_ASYNC=true)", {"DB_ASYNC": "true"})):
+        with serve(env) as base_url:
+            run_load(base_url, args.path, concurrency=args.concurrency, duration=2)  # warm-up
+            report(label, run_load(base_url, args.path, concurrency=args.concurrency, duration=args.duration))
+
+if __name__ == "__main__":
+    main()
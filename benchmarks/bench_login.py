@@ -0,0 +1,23 @@
+import argparse
+
+from .common import serve, run_load, report
+
+# Login throughput: POST /login with the same credentials, with and without the
+# successful-login cache. The user must already exist in the configured database.
+# Usage: python -m benchmarks.bench_login --username alice --password secret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    form = {"username": args.username, "password": args.password}
+    for label, env in (("full bcrypt verify (LOGIN_CACHE_SIZE=0)", {"LOGIN_CACHE_SIZE": "0"}), ("login cache", {})):
+        with serve(env) as base_url:
+            report(label, run_load(base_url, "/login", method="POST", concurrency=args.concurrency, duration=args.duration, data=form))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import time
+import tracemalloc
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from student import models, reads, schemas, serialization
+from student.database import Base
+
+# ORM vs Core (reads.py) on the hot read endpoints, in-process (no HTTP). One
+# "request" opens a session, runs the endpoint's query and serializes the response:
+#   faculty page   one page of the faculty list (--page rows)
+#   course         a single course by id
+# Reported per request: median latency and the peak memory allocated (tracemalloc).
+# Usage: python -m benchmarks.bench_reads --rows 10000 --page 50 --requests 2000
+
+def orm_faculty(db, limit):
+    return db.query(models.Instructor).order_by(models.Instructor.name, models.Instructor.id).limit(limit).all()
+
+def core_faculty(db, limit):
+    return db.execute(reads.FACULTY.order_by(models.Instructor.name, models.Instructor.id).limit(limit)).all()
+
+def orm_course(db, course_id):
+    return db.query(models.Course).filter(models.Course.id == course_id).first()
+
+def core_course(db, course_id):
+    return reads.fetch_one(db, reads.course(course_id))
+
+def measure(engine, requests, handler):
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        with Session(engine) as db:
+            handler(db, i)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    tracemalloc.start()
+    with Session(engine) as db:
+        handler(db, 0)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return latencies[len(latencies) // 2], peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(models.Instructor), [{"name": f"Instructor {i}"} for i in range(args.rows)])
+        db.execute(insert(models.Course), [{"code": f"C{i}", "title": f"Course {i}"} for i in range(args.rows)])
+        db.commit()
+
+    def faculty(load):
+        return lambda db, i: serialization.dump_json(List[schemas.Instructor], load(db, args.page))
+
+    def course(load):
+        return lambda db, i: serialization.dump_json(schemas.Course, load(db, i % args.rows + 1))
+
+    print(f"{'':<18} {'median':>10} {'peak memory':>12}")
+    for label, handler in (
+        ("faculty page orm", faculty(orm_faculty)),
+        ("faculty page core", faculty(core_faculty)),
+        ("course orm", course(orm_course)),
+        ("course core", course(core_course)),
+    ):
+        median, peak = measure(engine, args.requests, handler)
+        print(f"{label:<18} {median * 1e6:>8.0f}us {peak / 1024:>10.1f}KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .common import serve, run_load, report
+
+# Catalog read throughput with the response cache off, in-process (local) and in a
+# Redis-protocol server (the bundled resp_stub unless --redis-url is given), plus
+# revalidation with If-None-Match (304, no body).
+# Usage: python -m benchmarks.bench_response_cache --path /admins/faculty
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/admins/faculty")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    stub = None
+    redis_url = args.redis_url
+    if redis_url is None:
+        stub = subprocess.Popen([sys.executable, "-m", "benchmarks.resp_stub", "--port", "6399"])
+        time.sleep(0.5)
+        redis_url = "redis://127.0.0.1:6399/0"
+    try:
+        for label, env in (
+            ("no cache", {"RESPONSE_CACHE_BACKEND": "none"}),
+            ("local LRU", {"RESPONSE_CACHE_BACKEND": "local"}),
+            ("redis protocol", {"RESPONSE_CACHE_BACKEND": "redis", "RESPONSE_CACHE_URL": redis_url}),
+        ):
+            with serve(env) as base_url:
+                report(label, run_load(base_url, args.path, concurrency=args.concurrency, duration=args.duration))
+                etag = httpx.get(base_url + args.path).headers["etag"]
+                report(label + " + If-None-Match", run_load(base_url, args.path, concurrency=args.concurrency, duration=args.duration, headers={"If-None-Match": etag}))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+if __name__ == "__main__":
+    main()
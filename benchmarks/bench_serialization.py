@@ -0,0 +1,73 @@
+import argparse
+import os
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from student import models, schemas, serialization
+from student.database import Base
+
+# Fetch + serialization cost per 10k rows of the faculty list, in-process (no HTTP):
+#   response_model + json      FastAPI's default path: load ORM objects, validate them,
+#                              dump to Python (mode="json"), encode with the stdlib json
+#   response_model + orjson    the same with ORJSONResponse
+#   core rows + dump_json      Core rows of the two columns, serialization.dump_json
+#                              straight to bytes in pydantic-core
+# Usage: python -m benchmarks.bench_serialization --rows 10000 --repeat 20
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    db.execute(insert(models.Instructor), [{"name": f"Instructor {i}"} for i in range(args.rows)])
+    db.commit()
+
+    response_type = List[schemas.Instructor]
+    adapter = serialization.adapter(response_type)
+
+    def response_model(response_class):
+        def run():
+            faculty = db.query(models.Instructor).all()
+            content = adapter.dump_python(adapter.validate_python(faculty, from_attributes=True), mode="json")
+            # Do not let the identity map carry instances over to the next round
+            db.expunge_all()
+            return response_class(content).body
+        return run
+
+    def core_rows():
+        rows = db.execute(select(models.Instructor.id, models.Instructor.name)).all()
+        return serialization.dump_json(response_type, rows)
+
+    per_10k = 10000 / args.rows
+    for label, fn in (
+        ("response_model + json", response_model(JSONResponse)),
+        ("response_model + orjson", response_model(ORJSONResponse)),
+        ("core rows + dump_json", core_rows),
+    ):
+        elapsed = best_of(args.repeat, fn)
+        print(f"{label:<28} {elapsed * per_10k * 1000:>8.2f} ms / 10k rows")
+    db.close()
+
+if __name__ == "__main__":
+    main()
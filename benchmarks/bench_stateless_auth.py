@@ -0,0 +1,28 @@
+import argparse
+from types import SimpleNamespace
+
+from .common import serve, run_load, report
+
+# Compare GET /instructors/me/classes with DB-backed auth and with AUTH_STATELESS=true
+# The user must exist for the DB-backed run; the token is minted locally with the same SECRET_KEY
+# Usage: python -m benchmarks.bench_stateless_auth --user-id 1 --username prof
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    from student import oauth2
+    token = oauth2.create_user_token(SimpleNamespace(id=args.user_id, username=args.username))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for label, env in (("db lookup (AUTH_STATELESS=false)", {"AUTH_STATELESS": "false"}), ("stateless (AUTH_STATELESS=true)", {"AUTH_STATELESS": "true"})):
+        with serve(env) as base_url:
+            run_load(base_url, "/instructors/me/classes", concurrency=args.concurrency, duration=2, headers=headers)
+            report(label, run_load(base_url, "/instructors/me/classes", concurrency=args.concurrency, duration=args.duration, headers=headers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import sys
+
+from .common import serve, run_load, report
+
+# Throughput by worker count under the production gunicorn config (preload +
+# UvicornWorker). Use a CPU-bound path to see scaling, e.g. /login (bcrypt) or a
+# large list; the load generator is one process, so give it fewer cores than the server
+# (taskset) on small machines.
+# Usage: python -m benchmarks.bench_workers --workers 1,2,4 --path /admins/faculty
+
+def gunicorn_cmd(port):
+    return [sys.executable, "-m", "gunicorn", "student.main:app", "-c", "student/gunicorn_conf.py",
+            "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--path", default="/admins/faculty")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for workers in [int(value) for value in args.workers.split(",")]:
+        with serve({"WEB_CONCURRENCY": str(workers)}, port=args.port, cmd=gunicorn_cmd(args.port)) as base_url:
+            run_load(base_url, args.path, concurrency=args.concurrency, duration=2)  # warm-up
+            report(f"{workers} worker(s)", run_load(base_url, args.path, concurrency=args.concurrency, duration=args.duration))
+
+if __name__ == "__main__":
+    main()
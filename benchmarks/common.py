@@ -0,0 +1,63 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import httpx
+
+# Shared helpers for the benchmark scripts: spawn the app under uvicorn and hammer it with httpx
+
+@contextmanager
+def serve(env=None, port=8765, args=(), cmd=None):
+    proc_env = dict(os.environ)
+    proc_env.update(env or {})
+    if cmd is None:
+        cmd = [sys.executable, "-m", "uvicorn", "student.main:app", "--port", str(port), "--log-level", "warning", *args]
+    proc = subprocess.Popen(cmd, env=proc_env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(base_url + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+async def _worker(client, method, path, kwargs, stop_at, latencies, errors):
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+async def _run(base_url, method, path, concurrency, duration, kwargs):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        stop_at = time.monotonic() + duration
+        await asyncio.gather(*[_worker(client, method, path, kwargs, stop_at, latencies, errors) for _ in range(concurrency)])
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": len(errors),
+        "rps": round(count / duration, 1),
+        "p50_ms": round(latencies[count // 2] * 1000, 2) if count else None,
+        "p99_ms": round(latencies[int(count * 0.99)] * 1000, 2) if count else None,
+    }
+
+def run_load(base_url, path, method="GET", concurrency=50, duration=10.0, **kwargs):
+    return asyncio.run(_run(base_url, method, path, concurrency, duration, kwargs))
+
+def report(label, result):
+    print(f"{label:<40} {result['rps']:>10} req/s  p50={result['p50_ms']}ms  p99={result['p99_ms']}ms  errors={result['errors']}")
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+# In-memory stand-in for a Redis server, enough for the response cache backend:
+# PING, AUTH, SELECT, GET, SET (with PX/EX), DEL, INCR, FLUSHDB.
+# Usage: python -m benchmarks.resp_stub --port 6399
+
+_data = {}
+
+def _get(key):
+    value, expires_at = _data.get(key, (None, None))
+    if expires_at is not None and expires_at <= time.monotonic():
+        del _data[key]
+        return None
+    return value
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+def _execute(args):
+    command = args[0].upper()
+    if command in (b"PING", b"AUTH", b"SELECT"):
+        return b"+OK\r\n" if command != b"PING" else b"+PONG\r\n"
+    if command == b"GET":
+        return _bulk(_get(args[1]))
+    if command == b"SET":
+        expires_at = None
+        if len(args) >= 5 and args[3].upper() in (b"PX", b"EX"):
+            expires_at = time.monotonic() + int(args[4]) / (1000 if args[3].upper() == b"PX" else 1)
+        _data[args[1]] = (args[2], expires_at)
+        return b"+OK\r\n"
+    if command == b"DEL":
+        return b":%d\r\n" % sum(_data.pop(key, None) is not None for key in args[1:])
+    if command == b"INCR":
+        value = int(_get(args[1]) or 0) + 1
+        _data[args[1]] = (str(value).encode(), None)
+        return b":%d\r\n" % value
+    if command == b"FLUSHDB":
+        _data.clear()
+        return b"+OK\r\n"
+    return b"-ERR unknown command\r\n"
+
+async def _handle(reader, writer):
+    try:
+        while True:
+            header = await reader.readline()
+            if not header:
+                break
+            args = []
+            for _ in range(int(header[1:])):
+                length = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(length + 2))[:-2])
+            writer.write(_execute(args))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host="127.0.0.1", port=6399):
+    server = await asyncio.start_server(_handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=6399)
+    asyncio.run(serve(port=parser.parse_args().port))
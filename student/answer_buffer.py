@@ -0,0 +1,168 @@
+import itertools
+import logging
+import threading
+import time
+from sqlalchemy import exc
+from . import models, results
+from .bulk import upsert_statement
+from .config import settings
+from .database import SessionLocal
+from .metrics import Histogram, Counters
+
+# Write-behind buffer for test answers. Requests enqueue and return; a background
+# thread upserts the buffered rows in one transaction every ANSWER_BUFFER_FLUSH_MS
+# or as soon as ANSWER_BUFFER_BATCH_ROWS are waiting. A re-submitted answer replaces
+# the pending one, and the buffer refuses new rows past ANSWER_BUFFER_MAX_ROWS.
+# Clients were already told 202, so a flush that fails because the database is
+# unreachable puts its rows back and retries after the flush interval; only rows
+# the database rejects (IntegrityError, e.g. unknown student) are dropped.
+
+logger = logging.getLogger(__name__)
+
+class AnswerBufferFull(Exception):
+    pass
+
+flush_latency = Histogram()
+batch_size = Histogram(buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000))
+buffer_counters = Counters("enqueued", "flushed", "rejected", "flush_errors", "requeued", "dropped")
+
+# Flush attempts while draining before the remaining rows are given up
+_DRAIN_ATTEMPTS = 3
+
+_UPDATE_COLUMNS = ["term", "sy", "answer"]
+
+_rows = {}
+_cond = threading.Condition()
+_thread = None
+_stopping = False
+
+def enabled():
+    return settings.ANSWER_BUFFER_ENABLED
+
+def submit(student_id: int, test_item_id: int, term: str, sy: str, answer: str):
+    key = (student_id, test_item_id)
+    with _cond:
+        if key not in _rows and len(_rows) >= settings.ANSWER_BUFFER_MAX_ROWS:
+            buffer_counters.incr("rejected")
+            raise AnswerBufferFull()
+        _rows[key] = {"student_id": student_id, "test_item_id": test_item_id, "term": term, "sy": sy, "answer": answer}
+        buffer_counters.incr("enqueued")
+        if len(_rows) >= settings.ANSWER_BUFFER_BATCH_ROWS:
+            _cond.notify()
+
+# Put rows of a failed flush back ahead of newer ones, unless a newer answer for the
+# same item was queued meanwhile; rows beyond ANSWER_BUFFER_MAX_ROWS are dropped
+def _requeue(rows):
+    global _rows
+    with _cond:
+        pending = {}
+        for row in rows:
+            key = (row["student_id"], row["test_item_id"])
+            if key not in _rows:
+                pending[key] = row
+        room = max(settings.ANSWER_BUFFER_MAX_ROWS - len(_rows), 0)
+        kept = dict(itertools.islice(pending.items(), room))
+        _rows = {**kept, **_rows}
+    buffer_counters.incr("requeued", len(kept))
+    if len(pending) > len(kept):
+        logger.error("Answer buffer full, dropping %d answers of a failed flush", len(pending) - len(kept))
+        buffer_counters.incr("dropped", len(pending) - len(kept))
+
+# Database unreachable or connection lost: worth retrying the same rows later
+def _transient(error):
+    return isinstance(error, (exc.OperationalError, exc.InterfaceError)) or getattr(error, "connection_invalidated", False)
+
+def _write(rows):
+    db = SessionLocal()
+    try:
+        db.execute(upsert_statement(db, models.TestAnswer, ["student_id", "test_item_id"], _UPDATE_COLUMNS), rows)
+        results.refresh_student_scores(db, {row["student_id"] for row in rows}, {row["test_item_id"] for row in rows})
+        db.commit()
+    finally:
+        db.close()
+
+def _write_batch(rows):
+    try:
+        _write(rows)
+        buffer_counters.incr("flushed", len(rows))
+        return True
+    except Exception as error:
+        buffer_counters.incr("flush_errors")
+        if _transient(error):
+            logger.warning("Group commit of %d answers failed, requeued: %s", len(rows), error)
+            _requeue(rows)
+            return False
+        logger.exception("Group commit of %d answers failed, retrying row by row", len(rows))
+    # Isolate bad rows (e.g. unknown student) so they cannot block the rest
+    for i, row in enumerate(rows):
+        try:
+            _write([row])
+            buffer_counters.incr("flushed")
+        except exc.IntegrityError:
+            logger.exception("Dropping answer %s/%s", row["student_id"], row["test_item_id"])
+            buffer_counters.incr("dropped")
+        except Exception as error:
+            logger.warning("Answer %s/%s failed, requeued with the rest of its batch: %s", row["student_id"], row["test_item_id"], error)
+            _requeue(rows[i:])
+            return False
+    return True
+
+# Write one batch; False when the database was unreachable and rows were requeued
+def _flush(rows):
+    started = time.perf_counter()
+    try:
+        return _write_batch(rows)
+    finally:
+        flush_latency.observe(time.perf_counter() - started)
+        batch_size.observe(len(rows))
+
+def _run():
+    interval = settings.ANSWER_BUFFER_FLUSH_MS / 1000
+    failed = 0
+    while True:
+        with _cond:
+            # After a failed flush wait out the interval even with a full batch waiting
+            if failed or (not _stopping and len(_rows) < settings.ANSWER_BUFFER_BATCH_ROWS):
+                _cond.wait(interval)
+            if _stopping and failed >= _DRAIN_ATTEMPTS:
+                logger.error("Database unreachable while draining, dropping %d buffered answers", len(_rows))
+                buffer_counters.incr("dropped", len(_rows))
+                _rows.clear()
+            keys = list(itertools.islice(_rows, settings.ANSWER_BUFFER_BATCH_ROWS))
+            batch = [_rows.pop(key) for key in keys]
+        if batch:
+            failed = 0 if _flush(batch) else failed + 1
+        with _cond:
+            if _stopping and not _rows:
+                return
+
+def start():
+    global _thread, _stopping
+    if not enabled() or _thread is not None:
+        return
+    _stopping = False
+    _thread = threading.Thread(target=_run, name="answer-buffer", daemon=True)
+    _thread.start()
+
+# Flush everything still buffered, then stop the writer thread
+def drain():
+    global _thread, _stopping
+    if _thread is None:
+        return
+    with _cond:
+        _stopping = True
+        _cond.notify()
+    _thread.join()
+    _thread = None
+
+def get_stats():
+    with _cond:
+        depth = len(_rows)
+    return {
+        "enabled": enabled(),
+        "depth": depth,
+        "capacity": settings.ANSWER_BUFFER_MAX_ROWS,
+        "counters": buffer_counters.snapshot(),
+        "flush_latency_seconds": flush_latency.snapshot(),
+        "batch_size": batch_size.snapshot(),
+    }
@@ -0,0 +1,84 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select, exists, delete, insert
+from sqlalchemy.orm import aliased
+from . import models
+
+# Set-based test deletion: one ownership query, one EXISTS check for items shared with
+# tests outside the set, then the link rows and tests go in a single transaction.
+
+def owned_tests_statement(instructor_id: int, test_ids):
+    return select(models.TestCreate.test_id).filter(
+        models.TestCreate.instructor_id == instructor_id, models.TestCreate.test_id.in_(test_ids)
+    )
+
+def shared_items_statement(test_ids):
+    other = aliased(models.Construct)
+    return select(exists().where(
+        models.Construct.test_id.in_(test_ids),
+        other.test_item_id == models.Construct.test_item_id,
+        other.test_id.notin_(test_ids),
+    ))
+
+def delete_tests_statements(test_ids):
+    return [
+        delete(models.TestScore).where(models.TestScore.test_id.in_(test_ids)),
+        delete(models.Construct).where(models.Construct.test_id.in_(test_ids)),
+        delete(models.TestCreate).where(models.TestCreate.test_id.in_(test_ids)),
+        delete(models.Test).where(models.Test.id.in_(test_ids)),
+    ]
+
+def _check_owned(test_ids, owned):
+    missing = [test_id for test_id in test_ids if test_id not in owned]
+    if missing:
+        detail = "Test not found" if len(test_ids) == 1 else f"Tests not found: {', '.join(map(str, missing))}"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+SHARED_ITEMS_DETAIL = "Cannot delete test as some test items are being used by other instructors"
+
+def delete_tests(db, instructor_id: int, test_ids):
+    _check_owned(test_ids, set(db.scalars(owned_tests_statement(instructor_id, test_ids))))
+    if db.scalar(shared_items_statement(test_ids)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=SHARED_ITEMS_DETAIL)
+    for stmt in delete_tests_statements(test_ids):
+        db.execute(stmt, execution_options={"synchronize_session": False})
+    db.commit()
+
+async def delete_tests_async(db, instructor_id: int, test_ids):
+    _check_owned(test_ids, set(await db.scalars(owned_tests_statement(instructor_id, test_ids))))
+    if await db.scalar(shared_items_statement(test_ids)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=SHARED_ITEMS_DETAIL)
+    for stmt in delete_tests_statements(test_ids):
+        await db.execute(stmt, execution_options={"synchronize_session": False})
+    await db.commit()
+
+# Create a test with all of its items in one transaction: the test and item ids come
+# back through RETURNING, then the construct and lesson_make links are bulk inserted.
+def create_test_with_items(db, instructor_id: int, payload):
+    lesson_ids = {lesson_id for item in payload.items for lesson_id in item.lesson_ids}
+    if lesson_ids:
+        known = set(db.scalars(select(models.Lesson.id).filter(models.Lesson.id.in_(lesson_ids))))
+        if lesson_ids - known:
+            missing = ", ".join(map(str, sorted(lesson_ids - known)))
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Lessons not found: {missing}")
+
+    test_id = db.scalar(insert(models.Test).values(date=payload.date).returning(models.Test.id))
+    db.execute(insert(models.TestCreate).values(instructor_id=instructor_id, test_id=test_id, term=payload.term, sy=payload.sy))
+    items = []
+    if payload.items:
+        item_ids = db.scalars(
+            insert(models.TestItem).returning(models.TestItem.id, sort_by_parameter_order=True),
+            [{"question": item.question, "answer": item.answer} for item in payload.items],
+        ).all()
+        db.execute(insert(models.Construct), [
+            {"instructor_id": instructor_id, "test_item_id": item_id, "test_id": test_id, "term": payload.term, "sy": payload.sy}
+            for item_id in item_ids
+        ])
+        lesson_links = [
+            {"lesson_id": lesson_id, "test_item_id": item_id, "term": payload.term, "sy": payload.sy}
+            for item_id, item in zip(item_ids, payload.items) for lesson_id in dict.fromkeys(item.lesson_ids)
+        ]
+        if lesson_links:
+            db.execute(insert(models.LessonMake), lesson_links)
+        items = [{"id": item_id, "question": item.question, "answer": item.answer} for item_id, item in zip(item_ids, payload.items)]
+    db.commit()
+    return {"id": test_id, "date": payload.date, "items": items}
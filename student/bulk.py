@@ -0,0 +1,20 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+# INSERT construct for the session's dialect, so ON CONFLICT is available
+def insert_for(db, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    return insert(model)
+
+# INSERT ... ON CONFLICT (conflict_cols) DO UPDATE SET update_cols = excluded values.
+# Execute with a list of row dicts: db.execute(stmt, rows) batches them (executemany).
+def upsert_statement(db, model, conflict_cols, update_cols):
+    stmt = insert_for(db, model)
+    return stmt.on_conflict_do_update(
+        index_elements=conflict_cols,
+        set_={column: stmt.excluded[column] for column in update_cols},
+    )
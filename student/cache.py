@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from .metrics import Counters
+
+_MISSING = object()
+
+# Bounded in-process cache: least recently used entries are evicted past maxsize,
+# and entries older than ttl seconds are treated as misses
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = Counters("hits", "misses", "evictions", "expirations", "invalidations")
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.counters.incr("hits")
+                    return value
+                del self._data[key]
+                self.counters.incr("expirations")
+        self.counters.incr("misses")
+        return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.counters.incr("evictions")
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.counters.incr("invalidations")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._data)
+        return {"size": size, "maxsize": self.maxsize, "ttl": self.ttl, **self.counters.snapshot()}
@@ -0,0 +1,52 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import HTTPException, Request, Response, status
+
+# Conditional requests on versioned rows (models.Versioned). The strong ETag is the
+# row version and Last-Modified its updated_at, so GETs can be answered with 304
+# before anything is serialized and PUTs can require If-Match for optimistic concurrency.
+
+def is_versioned(row):
+    return getattr(row, "version", None) is not None and getattr(row, "updated_at", None) is not None
+
+def etag(row):
+    return f'"{row.version}"'
+
+def _http_date(value):
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes, they are stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+def validators(row):
+    return {"ETag": etag(row), "Last-Modified": _http_date(row.updated_at)}
+
+def _tags(header):
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+# If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+def not_modified(request: Request, headers: dict):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return if_none_match.strip() == "*" or headers.get("ETag") in _tags(if_none_match)
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+# 412 unless the client's If-Match names the row's current version; no header, no check
+def check_if_match(request: Request, row):
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return
+    # Strong comparison: weak tags never match
+    if etag(row) not in [tag.strip() for tag in if_match.split(",")]:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has been modified")
+
+# Send the row's validators with a write response
+def set_validators(response: Response, row):
+    response.headers.update(validators(row))
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,85 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Async database mode (AsyncEngine + async routers)
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Startup: DB_MIGRATION_CHECK is "strict" (refuse to start), "warn" or "off";
+    # DB_CREATE_ALL creates the tables instead (dev / SQLite only)
+    DB_MIGRATION_CHECK: str = "strict"
+    DB_CREATE_ALL: bool = False
+    DB_POOL_WARM: int = 2
+
+    # Connection pool, DB_POOL_MODE is "queue" or "null" (PgBouncer / external pooler)
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+
+    # Stateless auth: trust uid/role/ver claims instead of loading the user per request
+    AUTH_STATELESS: bool = False
+
+    # Cache of users resolved by get_current_user, keyed by the token subject (0 disables)
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 60
+
+    # Token revocations (PUT /me) and the user cache are per process by default: with
+    # several workers, the others keep accepting the old token until it expires and
+    # serving the cached old user for up to USER_CACHE_TTL. Point this at a Redis-protocol
+    # server (redis://host:6379/1) to share both across workers.
+    AUTH_SHARED_STATE_URL: Optional[str] = None
+
+    # bcrypt executor: "thread" or "process", workers default to the CPU count
+    HASH_EXECUTOR: str = "thread"
+    HASH_WORKERS: int = 0
+    HASH_QUEUE_LIMIT: int = 64
+
+    # bcrypt cost, plus a short-lived cache of successful credential checks (0 disables)
+    BCRYPT_ROUNDS: int = 12
+    LOGIN_CACHE_SIZE: int = 4096
+    LOGIN_CACHE_TTL: float = 30
+
+    # List endpoint page sizes
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+
+    # Write-behind buffer for single test answers
+    ANSWER_BUFFER_ENABLED: bool = False
+    ANSWER_BUFFER_MAX_ROWS: int = 20000
+    ANSWER_BUFFER_BATCH_ROWS: int = 500
+    ANSWER_BUFFER_FLUSH_MS: int = 200
+
+    # Bulk import pipeline
+    IMPORT_CHUNK_ROWS: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+    IMPORT_JOBS_KEEP: int = 100
+
+    # Read replicas (comma-separated URLs) for GET endpoints, with periodic health checks;
+    # a client that wrote recently keeps reading from the primary for READ_YOUR_WRITES_SECONDS
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_INTERVAL: float = 5
+    READ_YOUR_WRITES_SECONDS: float = 5
+
+    # Number of server processes, set by gunicorn_conf.py; per-process state such as the
+    # "local" response cache cannot be kept consistent across more than one
+    WEB_CONCURRENCY: int = 1
+
+    # Catalog response cache: RESPONSE_CACHE_BACKEND is "local", "redis" or "none".
+    # "local" is per process and invalidation only reaches the worker that handled the
+    # write, so it is refused (cache disabled) when WEB_CONCURRENCY > 1: use "redis" there.
+    RESPONSE_CACHE_BACKEND: str = "local"
+    RESPONSE_CACHE_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_SIZE: int = 1024
+    RESPONSE_CACHE_TTL: float = 300
+
+    # Per-request SQL stats (Server-Timing header) and the slow query log threshold (0 disables the log)
+    SQL_STATS_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 500
+
     class Config:
         env_file = ".env"
 
@@ -1,14 +1,123 @@
-import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
 from .config import settings
+from .metrics import Histogram, Counters
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(os.getenv("DATABASE_URL").replace("postgres://", "postgresql://"))
+
+# Pool metrics, shared by the sync and async engines
+pool_wait = Histogram()
+pool_counters = Counters("checkouts", "timeouts")
+
+# QueuePool that records how long each checkout waited for a connection
+class _TimedPoolMixin:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_counters.incr("timeouts")
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - started)
+        pool_counters.incr("checkouts")
+        return conn
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Build create_engine() pool arguments from settings
+def get_engine_options(is_async: bool = False):
+    if settings.DB_POOL_MODE == "null":
+        # Let PgBouncer own pooling; psycopg 3 must not use server-side prepared statements there
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+# SQLite only checks foreign keys when asked to, per connection: ask, so dev and test
+# databases reject the rows PostgreSQL would (e.g. import rows with an unknown parent)
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def enforce_foreign_keys(engine):
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_foreign_keys)
+
+engine = create_engine(DATABASE_URL.replace("postgres://", "postgresql://"), **get_engine_options())
+enforce_foreign_keys(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Map a sync URL onto the async driver: psycopg (v3) for PostgreSQL, aiosqlite for SQLite
+def to_async_url(url: str):
+    url = url.replace("postgres://", "postgresql://", 1)
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg://", 1)
+    elif url.startswith("sqlite://"):
+        url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+def get_async_database_url():
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return to_async_url(DATABASE_URL)
+
+# Async engine is only built in async mode, the sync path stays the default
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(get_async_database_url(), **get_engine_options(is_async=True))
+    enforce_foreign_keys(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# In a forked worker: forget the parent's pooled connections without closing them
+# (close=False leaves the parent's sockets alone), new ones are opened on demand
+def dispose_after_fork():
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+# Live pool statistics for one pool
+def pool_status(pool):
+    if isinstance(pool, QueuePool):
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+    return {"class": type(pool).__name__}
+
+def get_pool_stats():
+    stats = {
+        "mode": settings.DB_POOL_MODE,
+        "sync": pool_status(engine.pool),
+        "counters": pool_counters.snapshot(),
+        "wait_seconds": pool_wait.snapshot(),
+    }
+    if async_engine is not None:
+        stats["async"] = pool_status(async_engine.sync_engine.pool)
+    return stats
+
 # Dependency to get the database session
 def get_db():
     db = SessionLocal()
@@ -16,3 +125,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get the async database session
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled, set DB_ASYNC=true")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,39 @@
+import csv
+import io
+import orjson
+from sqlalchemy import select
+from .database import engine
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Stream every row of a table without materializing the result set: a server-side
+# cursor (stream_results) fetches EXPORT_BATCH_SIZE rows at a time and each batch
+# is encoded and handed to the response before the next one is read.
+# Runs on its own connection because request dependencies close before streaming starts.
+def stream_table(model, fmt: str):
+    columns = list(model.__table__.columns)
+    names = [column.name for column in columns]
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(
+            select(*columns).order_by(*model.__table__.primary_key.columns)
+        )
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # header only, for an empty table
+            if buffer.getvalue():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in rows)
@@ -0,0 +1,42 @@
+import logging
+import os
+
+# Production server: gunicorn master + UvicornWorker processes.
+#   gunicorn student.main:app -c student/gunicorn_conf.py
+# The app is imported once in the master (preload_app) and forked, so workers share
+# its memory copy-on-write; each worker then drops the connection pools it inherited.
+# Workers are recycled after max_requests (+ jitter so they do not all restart at once)
+# and get graceful_timeout seconds to drain in-flight requests and the lifespan
+# shutdown hooks (answer buffer flush, bcrypt executor) before being killed.
+# Tunables come from the environment: WEB_CONCURRENCY, PORT, GUNICORN_MAX_REQUESTS,
+# GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE.
+
+logger = logging.getLogger("gunicorn.error")
+
+def _cpu_count():
+    # Respect CPU affinity (containers, taskset) where the platform exposes it
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", 0)) or _cpu_count()
+# Tell the preloaded app how many processes serve it (settings.WEB_CONCURRENCY)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master during preload must not be shared
+    from student import database, replicas
+    database.dispose_after_fork()
+    replicas.dispose_after_fork()
+
+def worker_exit(server, worker):
+    logger.info("Worker %s exited after %s requests", worker.pid, getattr(worker, "nr", "?"))
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .config import settings
+from .metrics import Histogram, Counters
+from . import utils
+
+# Dedicated bcrypt executor so a login storm cannot starve the request threadpool.
+# Jobs beyond HASH_QUEUE_LIMIT are rejected with HashingOverloaded (served as 429).
+
+class HashingOverloaded(Exception):
+    pass
+
+hash_latency = Histogram()   # submit -> result, includes queueing
+hash_runtime = Histogram()   # time spent inside bcrypt
+hash_counters = Counters("submitted", "completed", "rejected")
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.HASH_WORKERS or os.cpu_count() or 1
+                if settings.HASH_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _executor
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+# Runs in the worker, module level so it pickles for the process pool
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+def _release(started):
+    def done(future):
+        global _pending
+        with _pending_lock:
+            _pending -= 1
+        hash_latency.observe(time.perf_counter() - started)
+        if not future.cancelled() and future.exception() is None:
+            hash_runtime.observe(future.result()[1])
+            hash_counters.incr("completed")
+    return done
+
+def _submit(fn, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.HASH_QUEUE_LIMIT:
+            hash_counters.incr("rejected")
+            raise HashingOverloaded()
+        _pending += 1
+    hash_counters.incr("submitted")
+    started = time.perf_counter()
+    try:
+        future = _get_executor().submit(_timed, fn, *args)
+    except Exception:
+        with _pending_lock:
+            _pending -= 1
+        raise
+    future.add_done_callback(_release(started))
+    return future
+
+# Awaitable variants: handlers await these instead of blocking a threadpool thread
+async def verify_password_async(plain_password, hashed_password):
+    result, _ = await asyncio.wrap_future(_submit(utils.verify_password, plain_password, hashed_password))
+    return result
+
+async def get_password_hash_async(password):
+    result, _ = await asyncio.wrap_future(_submit(utils.get_password_hash, password))
+    return result
+
+async def verify_and_update_async(plain_password, hashed_password):
+    result, _ = await asyncio.wrap_future(_submit(utils.verify_and_update, plain_password, hashed_password))
+    return result
+
+def get_stats():
+    with _pending_lock:
+        pending = _pending
+    return {
+        "executor": settings.HASH_EXECUTOR,
+        "workers": settings.HASH_WORKERS or os.cpu_count() or 1,
+        "queue_limit": settings.HASH_QUEUE_LIMIT,
+        "queue_depth": pending,
+        "counters": hash_counters.snapshot(),
+        "latency_seconds": hash_latency.snapshot(),
+        "runtime_seconds": hash_runtime.snapshot(),
+    }
@@ -0,0 +1,230 @@
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from pydantic import ValidationError
+from sqlalchemy import column, delete, insert, select, table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from . import models, schemas, rosters
+from .bulk import upsert_statement
+from .config import settings
+from .database import engine, SessionLocal
+
+# Bulk import of uploaded CSV / NDJSON files, run as a background job.
+# The file is read in chunks of IMPORT_CHUNK_ROWS. Each row is validated with the
+# target's pydantic schema and the valid rows of a chunk are loaded together: on
+# PostgreSQL they are COPY'd into a temporary staging table and merged into the
+# target with INSERT ... SELECT ... ON CONFLICT; elsewhere they are upserted with
+# executemany. A chunk that fails to merge is retried row by row to report which
+# rows were rejected. Roster and load counts are refreshed in the chunk's transaction.
+# The job runs in the process that took the upload; its status is written to the
+# import_job table when queued, after every chunk and at the end, so a poll answered
+# by any worker sees it.
+
+logger = logging.getLogger(__name__)
+
+IMPORT_TARGETS = {
+    "students": (models.Student, schemas.StudentImport),
+    "enrollments": (models.Enroll, schemas.EnrollBase),
+    "offers": (models.Offer, schemas.OfferBase),
+    "teaches": (models.Teach, schemas.TeachBase),
+}
+
+class ImportJob:
+    def __init__(self, target: str, path: str, fmt: str):
+        self.id = uuid.uuid4().hex
+        self.target = target
+        self.path = path
+        self.fmt = fmt
+        self.status = "queued"
+        self.rows_processed = 0
+        self.rows_loaded = 0
+        self.rows_failed = 0
+        self.bytes_total = os.path.getsize(path)
+        self.bytes_read = 0
+        self.errors = []
+        self.detail = None
+
+    def add_error(self, row: int, error: str):
+        self.rows_failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    def as_dict(self):
+        progress = 1.0 if self.status == "done" else (self.bytes_read / self.bytes_total if self.bytes_total else 0.0)
+        return {
+            "id": self.id,
+            "target": self.target,
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "rows_loaded": self.rows_loaded,
+            "rows_failed": self.rows_failed,
+            "progress": round(min(progress, 1.0), 4),
+            "errors": list(self.errors),
+            "detail": self.detail,
+        }
+
+def _save(job, prune=False):
+    with SessionLocal() as db:
+        db.merge(models.ImportJob(**job.as_dict()))
+        if prune:
+            # Keep the IMPORT_JOBS_KEEP most recent jobs, this one included (no autoflush)
+            db.flush()
+            stale = select(models.ImportJob.id).order_by(models.ImportJob.created_at.desc()).offset(settings.IMPORT_JOBS_KEEP)
+            db.execute(delete(models.ImportJob).where(models.ImportJob.id.in_(stale.scalar_subquery())), execution_options={"synchronize_session": False})
+        db.commit()
+
+# Spool the upload to disk so the background job does not depend on the request
+def create_job(target: str, upload, fmt: str):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{fmt}") as spool:
+        shutil.copyfileobj(upload, spool)
+    job = ImportJob(target, spool.name, fmt)
+    _save(job, prune=True)
+    return job
+
+def get_job(job_id: str):
+    with SessionLocal() as db:
+        return db.get(models.ImportJob, job_id)
+
+# (row number, raw record) pairs; row numbers are 1-based data rows
+def _read_records(binary, fmt: str):
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            for number, record in enumerate(csv.DictReader(text), start=1):
+                yield number, {key: (value if value != "" else None) for key, value in record.items()}
+        else:
+            for number, line in enumerate(text, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except ValueError as exc:
+                        yield number, exc
+    finally:
+        # Leave the binary file open for progress reporting
+        text.detach()
+
+def _merge_keys(model, columns):
+    primary_key = [col.name for col in model.__table__.primary_key.columns]
+    if all(name in columns for name in primary_key):
+        return primary_key, [name for name in columns if name not in primary_key]
+    # Surrogate key (students): plain insert
+    return None, None
+
+# Staging table DDL and the COPY that fills it
+def _stage_sql(model, columns):
+    column_list = ", ".join(columns)
+    return (
+        f"CREATE TEMP TABLE import_stage ON COMMIT DROP AS SELECT {column_list} FROM {model.__table__.name} WITH NO DATA",
+        f"COPY import_stage ({column_list}) FROM STDIN WITH (FORMAT csv)",
+    )
+
+# INSERT ... SELECT from the staging table, upserting on the primary key when the rows carry it
+def _merge_statement(model, columns):
+    conflict_cols, update_cols = _merge_keys(model, columns)
+    stage = table("import_stage", *[column(name) for name in columns])
+    merge = postgresql.insert(model.__table__).from_select(columns, select(*stage.columns))
+    if conflict_cols:
+        merge = merge.on_conflict_do_update(
+            index_elements=conflict_cols,
+            set_={name: merge.excluded[name] for name in update_cols},
+        )
+    return merge
+
+# COPY the chunk into a temp staging table, then merge it into the target
+def _load_chunk_copy(model, columns, rows):
+    create_sql, copy_sql = _stage_sql(model, columns)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[row[name] for name in columns] for row in rows])
+    buffer.seek(0)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(create_sql)
+        cursor = conn.connection.cursor()
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        conn.execute(_merge_statement(model, columns))
+        with Session(bind=conn) as db:
+            rosters.refresh_for(db, model, rows)
+
+def _load_chunk_orm(model, columns, rows):
+    conflict_cols, update_cols = _merge_keys(model, columns)
+    db = SessionLocal()
+    try:
+        if conflict_cols:
+            db.execute(upsert_statement(db, model, conflict_cols, update_cols), rows)
+        else:
+            db.execute(insert(model), rows)
+        rosters.refresh_for(db, model, rows)
+        db.commit()
+    finally:
+        db.close()
+
+def _load_chunk(model, columns, rows):
+    conflict_cols, _ = _merge_keys(model, columns)
+    if conflict_cols:
+        # ON CONFLICT cannot touch the same row twice in one statement: last row wins
+        rows = list({tuple(row[name] for name in conflict_cols): row for row in rows}.values())
+    if engine.dialect.name == "postgresql":
+        _load_chunk_copy(model, columns, rows)
+    else:
+        _load_chunk_orm(model, columns, rows)
+
+def _process_chunk(job, model, schema, columns, records):
+    valid, numbers = [], []
+    for number, record in records:
+        job.rows_processed += 1
+        if isinstance(record, Exception):
+            job.add_error(number, f"Invalid JSON: {record}")
+            continue
+        try:
+            valid.append(schema.model_validate(record).model_dump())
+            numbers.append(number)
+        except ValidationError as exc:
+            job.add_error(number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors()))
+    if not valid:
+        return
+    try:
+        _load_chunk(model, columns, valid)
+        job.rows_loaded += len(valid)
+    except Exception:
+        logger.exception("Import %s: chunk load failed, retrying row by row", job.id)
+        for number, row in zip(numbers, valid):
+            try:
+                _load_chunk_orm(model, columns, [row])
+                job.rows_loaded += 1
+            except Exception as exc:
+                job.add_error(number, str(getattr(exc, "orig", exc)).strip())
+
+# Background task entry point, in the process that created the job
+def run_job(job: ImportJob):
+    model, schema = IMPORT_TARGETS[job.target]
+    columns = list(schema.model_fields)
+    job.status = "running"
+    try:
+        _save(job)
+        with open(job.path, "rb") as binary:
+            records = _read_records(binary, job.fmt)
+            while True:
+                chunk = list(itertools.islice(records, settings.IMPORT_CHUNK_ROWS))
+                if not chunk:
+                    break
+                _process_chunk(job, model, schema, columns, chunk)
+                job.bytes_read = binary.tell()
+                _save(job)
+        job.status = "done"
+    except Exception as exc:
+        logger.exception("Import %s failed", job.id)
+        job.status = "failed"
+        job.detail = str(exc)
+    finally:
+        os.unlink(job.path)
+        _save(job)
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+from . import database, hashing, answer_buffer, replicas
+from .config import settings
+
+# App lifespan. Startup no longer creates tables: it checks that the database is at
+# the Alembic head(s) with one query, opens DB_POOL_WARM connections ahead of the
+# first requests and only then reports ready (/health/ready). Shutdown flips
+# readiness off first so load balancers stop routing before the drain.
+# DB_CREATE_ALL=true restores create_all for throwaway databases (dev, SQLite).
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_DIR = os.path.join(PROJECT_DIR, "alembic")
+# Retired branches: their schema is not the one the app uses, so there is no upgrade path
+RETIRED_REVISIONS = {"n312ae45d3075"}
+
+class MigrationMismatch(RuntimeError):
+    pass
+
+_imported_at = time.perf_counter()
+state = {"ready": False, "startup_seconds": None, "phases": {}, "revision": None}
+
+def expected_heads():
+    return set(ScriptDirectory(ALEMBIC_DIR).get_heads())
+
+def check_migrations():
+    with database.engine.connect() as conn:
+        current = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    heads = expected_heads()
+    state["revision"] = sorted(current)
+    if current & RETIRED_REVISIONS:
+        raise MigrationMismatch(
+            f"Database is at the retired revision {sorted(current & RETIRED_REVISIONS)}, whose tables the app "
+            f"does not use: restore it from a backup taken at {sorted(heads)} or recreate it with `cd {PROJECT_DIR} && alembic upgrade head`"
+        )
+    if current != heads:
+        # .env and alembic.ini paths are relative to the project directory
+        raise MigrationMismatch(
+            f"Database is at {sorted(current) or 'no revision'}, code expects {sorted(heads)}: "
+            f"run `cd {PROJECT_DIR} && alembic upgrade head`"
+        )
+
+def _warm_size(engine):
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+    return min(settings.DB_POOL_WARM, pool.size())
+
+# Check out the connections all at once so the pool really opens that many
+def warm_pool():
+    connections = [database.engine.connect() for _ in range(_warm_size(database.engine))]
+    for conn in connections:
+        conn.close()
+    return len(connections)
+
+async def warm_async_pool():
+    if database.async_engine is None:
+        return 0
+    size = _warm_size(database.async_engine.sync_engine)
+    connections = await asyncio.gather(*[database.async_engine.connect() for _ in range(size)])
+    for conn in connections:
+        await conn.close()
+    return size
+
+def _phase(name, started):
+    state["phases"][name] = round(time.perf_counter() - started, 4)
+
+async def startup():
+    started = time.perf_counter()
+    if settings.DB_CREATE_ALL:
+        await run_in_threadpool(database.Base.metadata.create_all, bind=database.engine)
+        _phase("create_all", started)
+    elif settings.DB_MIGRATION_CHECK != "off":
+        phase_started = time.perf_counter()
+        try:
+            await run_in_threadpool(check_migrations)
+        except Exception as error:
+            if settings.DB_MIGRATION_CHECK == "strict":
+                raise
+            logger.warning("Migration check failed: %s", error)
+        _phase("migration_check", phase_started)
+
+    phase_started = time.perf_counter()
+    warmed = await run_in_threadpool(warm_pool) + await warm_async_pool()
+    _phase("pool_warm", phase_started)
+    state["warmed_connections"] = warmed
+
+    answer_buffer.start()
+    replicas.start()
+    state["startup_seconds"] = round(time.perf_counter() - started, 4)
+    state["since_import_seconds"] = round(time.perf_counter() - _imported_at, 4)
+    state["ready"] = True
+    logger.info("Ready in %.3fs (%s)", state["startup_seconds"], state["phases"])
+
+async def shutdown():
+    state["ready"] = False
+    await run_in_threadpool(answer_buffer.drain)
+    await run_in_threadpool(hashing.shutdown)
+    await run_in_threadpool(replicas.stop)
+
+@asynccontextmanager
+async def lifespan(app):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+def get_stats():
+    return dict(state)
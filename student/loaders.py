@@ -0,0 +1,69 @@
+from sqlalchemy import select
+from . import models
+
+# Loading plan for schemas.Assessment: the tests are loaded first, then the items of
+# all of them in a single query through the construct links, grouped in Python.
+# Listing N tests therefore costs two queries instead of one per test.
+
+def assessment_items_statement(test_ids):
+    return (
+        select(models.Construct.test_id, models.TestItem)
+        .join(models.Construct, models.Construct.test_item_id == models.TestItem.id)
+        .filter(models.Construct.test_id.in_(test_ids))
+        .distinct()
+        .order_by(models.Construct.test_id, models.TestItem.id)
+    )
+
+def group_assessments(tests, item_rows):
+    items = {test.id: [] for test in tests}
+    for test_id, item in item_rows:
+        items[test_id].append(item)
+    return [{"test": test, "items": items[test.id]} for test in tests]
+
+def load_assessments(db, tests):
+    if not tests:
+        return []
+    rows = db.execute(assessment_items_statement([test.id for test in tests])).all()
+    return group_assessments(tests, rows)
+
+async def load_assessments_async(db, tests):
+    if not tests:
+        return []
+    result = await db.execute(assessment_items_statement([test.id for test in tests]))
+    return group_assessments(tests, result.all())
+
+# Student, program and enrolled courses of many students in one joined query,
+# as plain columns: no ORM instances are built for these rows
+def student_enrollments_statement(student_ids):
+    return (
+        select(
+            models.Student.id, models.Student.student_id, models.AcadProgram.id, models.AcadProgram.acad_name,
+            models.Course.id, models.Course.code, models.Course.title, models.Enroll.term, models.Enroll.sy,
+        )
+        .join(models.AcadProgram, models.AcadProgram.id == models.Student.acad_program_id)
+        .outerjoin(models.Enroll, models.Enroll.student_id == models.Student.id)
+        .outerjoin(models.Course, models.Course.id == models.Enroll.course_id)
+        .filter(models.Student.id.in_(student_ids))
+        .order_by(models.Student.id, models.Course.id)
+    )
+
+def group_student_enrollments(rows):
+    enrollments = {}
+    for student_pk, student_id, acad_program_id, acad_name, course_id, code, title, term, sy in rows:
+        entry = enrollments.get(student_pk)
+        if entry is None:
+            entry = enrollments[student_pk] = {
+                "student": {"id": student_pk, "student_id": student_id},
+                "acad_program": {"id": acad_program_id, "acad_name": acad_name},
+                "enrollments": [],
+            }
+        if course_id is not None:
+            entry["enrollments"].append({"id": course_id, "code": code, "title": title, "term": term, "sy": sy})
+    return enrollments
+
+def load_student_enrollments(db, student_ids):
+    return group_student_enrollments(db.execute(student_enrollments_statement(student_ids)).all())
+
+async def load_student_enrollments_async(db, student_ids):
+    result = await db.execute(student_enrollments_statement(student_ids))
+    return group_student_enrollments(result.all())
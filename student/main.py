@@ -1,14 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-from .database import engine, Base
-from .routers import auth, student, instructor, admin
+from .routers import auth, student, instructor, admin, metrics, export, health
+from .routers import async_student, async_instructor, async_admin
 from .config import settings
+from . import hashing, answer_buffer, replicas, lifecycle, query_stats
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
+app = FastAPI(lifespan=lifecycle.lifespan, default_response_class=ORJSONResponse)
 
 # Set up CORS (Cross-Origin Resource Sharing)
 origins = [
@@ -27,11 +27,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shed load when the bcrypt executor queue is full
+@app.exception_handler(hashing.HashingOverloaded)
+def hashing_overloaded_handler(request: Request, exc: hashing.HashingOverloaded):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many concurrent password operations, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# Answers are still buffered when the buffer is full: ask the client to retry
+@app.exception_handler(answer_buffer.AnswerBufferFull)
+def answer_buffer_full_handler(request: Request, exc: answer_buffer.AnswerBufferFull):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Answer buffer is full, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# Reads right after a client's own write go to the primary
+if replicas.enabled():
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            replicas.note_write(response)
+        return response
+
+# Query count and DB time of each request, sent back as Server-Timing
+if settings.SQL_STATS_ENABLED:
+    query_stats.install()
+
+    @app.middleware("http")
+    async def sql_timing(request: Request, call_next):
+        stats, token = query_stats.begin(f"{request.method} {request.url.path}")
+        try:
+            response = await call_next(request)
+        finally:
+            query_stats.end(stats, token)
+        response.headers.append("Server-Timing", stats.server_timing())
+        return response
+
+# A versioned row changed between read and write (concurrent update)
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        content={"detail": "Resource has been modified"},
+    )
+
+
 # Include routers
+# In async mode the async routers go first so their routes shadow the sync ones
+if settings.DB_ASYNC:
+    app.include_router(async_student.router)
+    app.include_router(async_instructor.router)
+    app.include_router(async_admin.router)
 app.include_router(auth.router)
 app.include_router(student.router)
 app.include_router(instructor.router)
 app.include_router(admin.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
 
 @app.get("/")
 def read_root():
@@ -1,8 +1,23 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date
-from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, JSON, text
+from sqlalchemy.orm import relationship, declared_attr
 from .database import Base
 
-class AcadProgram(Base):
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+# Row version for conditional requests: `version` is bumped by the ORM on every
+# UPDATE (and checked in its WHERE clause, so a concurrent update raises StaleDataError),
+# `updated_at` is the last write time
+class Versioned:
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version}
+
+class AcadProgram(Versioned, Base):
     __tablename__ = "acad_program"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     acad_name = Column(String, index=True, nullable=False)
@@ -10,7 +25,7 @@ class AcadProgram(Base):
     studies = relationship("Study", back_populates="acad_program")
     offers = relationship("Offer", back_populates="acad_program")
 
-class Student(Base):
+class Student(Versioned, Base):
     __tablename__ = "student"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     student_id = Column(String, index=True, nullable=False)
@@ -18,51 +33,52 @@ class Student(Base):
     acad_program = relationship("AcadProgram", back_populates="students")
     studies = relationship("Study", back_populates="student")
     enrollments = relationship("Enroll", back_populates="student")
-    takes = relationship("Take", back_populates="student")
-    answers = relationship("Answer", back_populates="student")
+    takes = relationship("TestTake", back_populates="student")
+    answers = relationship("TestAnswer", back_populates="student")
 
-class Course(Base):
+class Course(Versioned, Base):
     __tablename__ = "course"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     code = Column(String, index=True, nullable=False)
     title = Column(String, index=True, nullable=False)
     enrollments = relationship("Enroll", back_populates="course")
     offers = relationship("Offer", back_populates="course")
-    has_lessons = relationship("Have", back_populates="course")
+    has_lessons = relationship("CourseHave", back_populates="course")
     teaches = relationship("Teach", back_populates="course")
 
-class Lesson(Base):
+class Lesson(Versioned, Base):
     __tablename__ = "lesson"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, index=True, nullable=False)
-    has_lessons = relationship("Have", back_populates="lesson")
-    from_tests = relationship("From", back_populates="lesson")
-    makes_test_items = relationship("Make", back_populates="lesson")
+    has_lessons = relationship("CourseHave", back_populates="lesson")
+    from_tests = relationship("LessonFrom", back_populates="lesson")
+    makes_test_items = relationship("LessonMake", back_populates="lesson")
 
-class Instructor(Base):
+class Instructor(Versioned, Base):
     __tablename__ = "instructor"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, index=True, nullable=False)
     teaches = relationship("Teach", back_populates="instructor")
-    creates = relationship("Create", back_populates="instructor")
+    creates = relationship("TestCreate", back_populates="instructor")
     constructs = relationship("Construct", back_populates="instructor")
 
-class Test(Base):
+class Test(Versioned, Base):
     __tablename__ = "test"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     date = Column(Date, nullable=False)
-    creates = relationship("Create", back_populates="test")
-    takes = relationship("Take", back_populates="test")
-    from_tests = relationship("From", back_populates="test")
+    creates = relationship("TestCreate", back_populates="test")
+    takes = relationship("TestTake", back_populates="test")
+    from_tests = relationship("LessonFrom", back_populates="test")
+    constructs = relationship("Construct", back_populates="test")
 
-class TestItem(Base):
+class TestItem(Versioned, Base):
     __tablename__ = "test_item"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     question = Column(String, index=True, nullable=False)
     answer = Column(String, index=True, nullable=False)
     constructs = relationship("Construct", back_populates="test_item")
-    answers = relationship("Answer", back_populates="test_item")
-    makes_test_items = relationship("Make", back_populates="test_item")
+    answers = relationship("TestAnswer", back_populates="test_item")
+    makes_test_items = relationship("LessonMake", back_populates="test_item")
 
 class Study(Base):
     __tablename__ = "study"
@@ -76,7 +92,7 @@ class Study(Base):
 class Enroll(Base):
     __tablename__ = "enroll"
     student_id = Column(Integer, ForeignKey('student.id'), primary_key=True)
-    course_id = Column(Integer, ForeignKey('course.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('course.id'), primary_key=True, index=True)
     term = Column(String, nullable=False)
     sy = Column(String, nullable=False)
     student = relationship("Student", back_populates="enrollments")
@@ -94,7 +110,7 @@ class Offer(Base):
 class Teach(Base):
     __tablename__ = "teach"
     instructor_id = Column(Integer, ForeignKey('instructor.id'), primary_key=True)
-    course_id = Column(Integer, ForeignKey('course.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('course.id'), primary_key=True, index=True)
     term = Column(String, nullable=False)
     sy = Column(String, nullable=False)
     instructor = relationship("Instructor", back_populates="teaches")
@@ -113,10 +129,12 @@ class Construct(Base):
     __tablename__ = "construct"
     instructor_id = Column(Integer, ForeignKey('instructor.id'), primary_key=True)
     test_item_id = Column(Integer, ForeignKey('test_item.id'), primary_key=True)
+    test_id = Column(Integer, ForeignKey('test.id'), index=True)
     term = Column(String, nullable=False)
     sy = Column(String, nullable=False)
     instructor = relationship("Instructor", back_populates="constructs")
     test_item = relationship("TestItem", back_populates="constructs")
+    test = relationship("Test", back_populates="constructs")
 
 class TestTake(Base):
     __tablename__ = "test_take"
@@ -130,12 +148,50 @@ class TestTake(Base):
 class TestAnswer(Base):
     __tablename__ = "test_answer"
     student_id = Column(Integer, ForeignKey('student.id'), primary_key=True)
-    test_item_id = Column(Integer, ForeignKey('test_item.id'), primary_key=True)
+    test_item_id = Column(Integer, ForeignKey('test_item.id'), primary_key=True, index=True)
     term = Column(String, nullable=False)
     sy = Column(String, nullable=False)
+    answer = Column(String)
     student = relationship("Student", back_populates="answers")
     test_item = relationship("TestItem", back_populates="answers")
 
+class TestScore(Base):
+    __tablename__ = "test_score"
+    test_id = Column(Integer, ForeignKey('test.id'), primary_key=True)
+    student_id = Column(Integer, ForeignKey('student.id'), primary_key=True)
+    correct = Column(Integer, nullable=False)
+    answered = Column(Integer, nullable=False)
+
+class CourseRoster(Base):
+    __tablename__ = "course_roster"
+    course_id = Column(Integer, ForeignKey('course.id'), primary_key=True)
+    term = Column(String, primary_key=True)
+    sy = Column(String, primary_key=True)
+    students = Column(Integer, nullable=False)
+
+class InstructorLoad(Base):
+    __tablename__ = "instructor_load"
+    instructor_id = Column(Integer, ForeignKey('instructor.id'), primary_key=True)
+    term = Column(String, primary_key=True)
+    sy = Column(String, primary_key=True)
+    courses = Column(Integer, nullable=False)
+    students = Column(Integer, nullable=False)
+
+# Status of bulk import jobs (importer.py), shared by every server process
+class ImportJob(Base):
+    __tablename__ = "import_job"
+    id = Column(String, primary_key=True)
+    target = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_loaded = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    progress = Column(Float, nullable=False, default=0.0)
+    errors = Column(JSON, nullable=False, default=list)
+    detail = Column(String)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, index=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
 class CourseHave(Base):
     __tablename__ = "course_have"
     course_id = Column(Integer, ForeignKey('course.id'), primary_key=True)
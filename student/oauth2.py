@@ -1,11 +1,21 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from . import schemas, models, database
-from .utils import verify_password, get_password_hash
+from starlette.concurrency import run_in_threadpool
+from . import schemas, models, database, hashing
+from .cache import TTLCache
 from .config import settings
+from .response_cache import RedisBackend
 
 # Constants
 SECRET_KEY = settings.SECRET_KEY
@@ -15,12 +25,94 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 # OAuth2 password bearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Utility function to authenticate user
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if not user or not verify_password(password, user.password):
+logger = logging.getLogger(__name__)
+
+# Token revocations and resolved users are kept per process unless AUTH_SHARED_STATE_URL
+# names a Redis-protocol server: then revocations are also recorded there and checked
+# by every worker, and the user cache lives there so invalidate_user reaches them all.
+# A shared store outage falls back to this process's own state.
+_shared_revocations = _shared_users = None
+if settings.AUTH_SHARED_STATE_URL:
+    _shared_revocations = RedisBackend(settings.AUTH_SHARED_STATE_URL, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    if settings.USER_CACHE_SIZE:
+        _shared_users = RedisBackend(settings.AUTH_SHARED_STATE_URL, settings.USER_CACHE_TTL)
+elif settings.WEB_CONCURRENCY > 1:
+    logger.warning("Token revocation and the user cache are per worker with %d workers, set AUTH_SHARED_STATE_URL", settings.WEB_CONCURRENCY)
+
+def _shared(operation, *args):
+    try:
+        return operation(*args)
+    except Exception as error:
+        logger.warning("Shared auth state %s failed: %s", operation.__name__, error)
+        return None
+
+# Recent successful logins, keyed by username and an HMAC of the submitted password
+# and the stored hash, so a retry storm does not pay for bcrypt on every attempt.
+# A changed password changes the stored hash, which retires the old entries.
+login_cache = TTLCache(settings.LOGIN_CACHE_SIZE, settings.LOGIN_CACHE_TTL)
+
+def _login_cache_key(username: str, password: str, hashed_password: str):
+    message = "\0".join((username, password, hashed_password)).encode()
+    return username, hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+def _find_user(db: Session, username: str):
+    return db.query(models.User).filter(models.User.username == username).first()
+
+# Utility function to authenticate user (sync session). Async so that bcrypt waits on
+# the hashing executor instead of holding a request threadpool thread; the queries
+# run in the threadpool.
+async def authenticate_user(db: Session, username: str, password: str):
+    user = await run_in_threadpool(_find_user, db, username)
+    if not user:
+        return False
+    if login_cache.get(_login_cache_key(username, password, user.password)):
+        return user
+    verified, new_hash = await hashing.verify_and_update_async(password, user.password)
+    if not verified:
         return False
-    return user 
+    # Rehash with the configured bcrypt cost
+    if new_hash:
+        user.password = new_hash
+        await run_in_threadpool(db.commit)
+    login_cache.set(_login_cache_key(username, password, user.password), True)
+    return user
+
+# Save a new user whose password is already hashed
+def add_user(db: Session, user):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+# Store new credentials (password already hashed), retiring the user's tokens and cache entries
+def update_credentials(db: Session, principal, username: str, hashed_password: str):
+    db_user = db.query(models.User).filter(models.User.id == principal.id).first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_user.username = username
+    db_user.password = hashed_password
+    db.commit()
+    db.refresh(db_user)
+    revoke_user_tokens(db_user.id, getattr(db_user, "token_version", None) or 0)
+    invalidate_user(principal.username, db_user.username)
+    return db_user
+
+# Utility function to authenticate user (async session)
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    result = await db.execute(select(models.User).filter(models.User.username == username))
+    user = result.scalars().first()
+    if not user:
+        return False
+    if login_cache.get(_login_cache_key(username, password, user.password)):
+        return user
+    verified, new_hash = await hashing.verify_and_update_async(password, user.password)
+    if not verified:
+        return False
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+    login_cache.set(_login_cache_key(username, password, user.password), True)
+    return user
 
 # Utility function to create access token
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -33,21 +125,152 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# Utility function to get current user
-def get_current_user(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
+# Access token for a user, with the claims needed by the stateless auth path
+def create_user_token(user):
+    return create_access_token(data={
+        "sub": user.username,
+        "uid": user.id,
+        "role": getattr(user, "role", None),
+        "ver": getattr(user, "token_version", None) or 0,
+        "iat": time.time(),
+    })
+
+# Per-user token revocation: user id -> (minimum valid version, not-before timestamp).
+# Entries only need to outlive the tokens they cover, so they expire with the token lifetime.
+_revocations = {}
+_revocations_lock = threading.Lock()
+
+def revoke_user_tokens(user_id: int, min_version: int = 0):
+    not_before = time.time()
+    with _revocations_lock:
+        _revocations[user_id] = (min_version, not_before, time.monotonic())
+    if _shared_revocations is not None:
+        _shared(_shared_revocations.set, f"revoked:{user_id}", json.dumps([min_version, not_before]))
+
+def _local_revocation(user_id: int):
+    with _revocations_lock:
+        entry = _revocations.get(user_id)
+        if entry is None:
+            return None
+        min_version, not_before, recorded_at = entry
+        if time.monotonic() - recorded_at > ACCESS_TOKEN_EXPIRE_MINUTES * 60:
+            del _revocations[user_id]
+            return None
+    return min_version, not_before
+
+def _is_revoked(user_id: int, version: int, issued_at: float):
+    entries = [_local_revocation(user_id)]
+    if _shared_revocations is not None:
+        shared = _shared(_shared_revocations.get, f"revoked:{user_id}")
+        entries.append(json.loads(shared) if shared else None)
+    return any(version < min_version or issued_at < not_before for min_version, not_before in filter(None, entries))
+
+def credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+# Utility function to decode the token and return its subject
+def get_token_subject(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception()
+    return username
+
+# Resolved users, keyed by the token subject. Values are detached immutable snapshots
+# so a cached entry never touches the session it was loaded with.
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+def snapshot_user(user):
+    return schemas.Principal(
+        id=user.id,
+        username=user.username,
+        role=getattr(user, "role", None),
+        token_version=getattr(user, "token_version", None) or 0,
+    )
+
+def _cached_user(username: str):
+    if _shared_users is None:
+        return user_cache.get(username)
+    cached = _shared(_shared_users.get, f"user:{username}")
+    return schemas.Principal.model_validate_json(cached) if cached else None
+
+def _cache_user(username: str, user):
+    if _shared_users is None:
+        user_cache.set(username, user)
+    else:
+        _shared(_shared_users.set, f"user:{username}", user.model_dump_json())
+
+# Drop cached entries after a user's username or password changes
+def invalidate_user(*usernames: str):
+    for username in usernames:
+        user_cache.invalidate(username)
+        if _shared_users is not None:
+            _shared(_shared_users.delete, f"user:{username}")
+
+# Utility function to get current user
+def get_current_user(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
+    username = get_token_subject(token)
+    user = _cached_user(username)
+    if user is not None:
+        return user
     user = db.query(models.User).filter(models.User.username == username).first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
+    user = snapshot_user(user)
+    _cache_user(username, user)
+    return user
+
+# Utility function to get current user (async session)
+async def get_current_user_async(db: AsyncSession = Depends(database.get_async_db), token: str = Depends(oauth2_scheme)):
+    username = get_token_subject(token)
+    user = _cached_user(username)
+    if user is not None:
+        return user
+    result = await db.execute(select(models.User).filter(models.User.username == username))
+    user = result.scalars().first()
+    if user is None:
+        raise credentials_exception()
+    user = snapshot_user(user)
+    _cache_user(username, user)
     return user
+
+# Build the principal from the token claims alone, no database access
+def get_token_principal(token: str):
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception()
+    username, user_id = payload.get("sub"), payload.get("uid")
+    if username is None or user_id is None:
+        raise credentials_exception()
+    principal = schemas.Principal(id=user_id, username=username, role=payload.get("role"), token_version=payload.get("ver", 0))
+    if _is_revoked(principal.id, principal.token_version, payload.get("iat", 0)):
+        raise credentials_exception()
+    return principal
+
+# Current identity: token principal in stateless mode, otherwise the database user
+def get_current_principal(db: Session, token: str):
+    if settings.AUTH_STATELESS:
+        return get_token_principal(token)
+    return get_current_user(db, token)
+
+async def get_current_principal_async(db: AsyncSession, token: str):
+    if settings.AUTH_STATELESS:
+        return get_token_principal(token)
+    return await get_current_user_async(db, token)
+
+# Route dependency limited to some roles: 401 without a valid token, 403 for other roles
+def require_roles(*roles: str):
+    def dependency(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
+        principal = get_current_principal(db, token)
+        if principal.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        return principal
+    return dependency
@@ -0,0 +1,85 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, or_
+from .config import settings
+
+# Opaque keyset cursor: the sort-key values of the last row, base64url encoded JSON
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+# Rows strictly after `values` in (k1, k2, ...) order, spelled out so it works without row-value support
+def _after(keys, values):
+    clauses = []
+    for i, key in enumerate(keys):
+        clauses.append(and_(*[k == v for k, v in zip(keys[:i], values[:i])], key > values[i]))
+    return or_(*clauses)
+
+# One page of a list endpoint. Works with both ORM Query and select() statements:
+#   page.apply(query, Model.name, Model.id) -> ordered, filtered, limited statement
+#   page.finish(rows) -> rows of this page, with Link / X-Next-Cursor headers set
+class Page:
+    def __init__(self, request: Request, response: Response, limit: int, offset: int, cursor: Optional[str]):
+        self.request = request
+        self.response = response
+        self.limit = min(limit or settings.PAGE_SIZE_DEFAULT, settings.PAGE_SIZE_MAX)
+        self.offset = offset
+        self.cursor = cursor
+        self.keys = ()
+
+    def apply(self, query, *keys):
+        self.keys = keys
+        query = query.order_by(*keys)
+        if self.cursor:
+            values = decode_cursor(self.cursor)
+            if len(values) != len(keys):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            query = query.filter(_after(keys, values))
+        elif self.offset:
+            query = query.offset(self.offset)
+        # One extra row tells us whether there is a next page
+        return query.limit(self.limit + 1)
+
+    def finish(self, rows):
+        rows = list(rows)
+        if len(rows) <= self.limit:
+            return rows
+        rows = rows[:self.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in self.keys])
+        next_url = self.request.url.remove_query_params("offset").include_query_params(cursor=next_cursor, limit=self.limit)
+        self.response.headers["Link"] = f'<{next_url}>; rel="next"'
+        self.response.headers["X-Next-Cursor"] = next_cursor
+        return rows
+
+# Dependency for paginated list endpoints
+def get_page(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+):
+    return Page(request, response, limit, offset, cursor)
+
+# Parse a comma-separated "ids" query parameter for batch endpoints, capped at PAGE_SIZE_MAX
+def parse_ids(ids: str):
+    try:
+        values = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must be comma-separated integers")
+    if not values:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must not be empty")
+    if len(values) > settings.PAGE_SIZE_MAX:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"At most {settings.PAGE_SIZE_MAX} ids per request")
+    return values
@@ -0,0 +1,110 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+from .metrics import Histogram, Counters
+
+# Per-request SQL instrumentation. Cursor execute events of every engine (primary,
+# replicas, the async engines' sync side) are timed and added to the stats of the
+# current request, held in a ContextVar set by the middleware in main.py; the
+# threadpool running sync endpoints inherits it. Each response gets a Server-Timing
+# header with the query count, total DB time and the slowest statement's time, and
+# statements slower than SLOW_QUERY_MS are logged with the request they ran for.
+# max_queries() asserts an upper bound on the queries a block of code runs.
+
+logger = logging.getLogger(__name__)
+
+counters = Counters("requests", "queries", "slow_queries")
+request_seconds = Histogram()
+request_queries = Histogram(buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+
+class QueryStats:
+    def __init__(self, label: str = None, keep_statements: bool = False):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+        self.statements = [] if keep_statements else None
+
+    def add(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds, self.slowest_statement = seconds, statement
+        if self.statements is not None:
+            self.statements.append(statement)
+
+    def server_timing(self):
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries", db-slowest;dur={self.slowest_seconds * 1000:.2f}'
+
+_current: ContextVar = ContextVar("query_stats", default=None)
+# Collectors of max_queries(), they see the queries of every thread
+_collectors = []
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    counters.incr("queries")
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, seconds)
+    for collector in _collectors:
+        collector.add(statement, seconds)
+    if settings.SLOW_QUERY_MS and seconds * 1000 >= settings.SLOW_QUERY_MS:
+        counters.incr("slow_queries")
+        # Statement only (on one line), parameters may hold credentials
+        logger.warning("Slow query (%.1f ms) in %s: %s", seconds * 1000, stats.label if stats else "background", " ".join(statement.split()))
+
+_installed = False
+
+def install():
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+# Bind fresh stats to the current context, e.g. for one request
+def begin(label: str = None):
+    stats = QueryStats(label)
+    return stats, _current.set(stats)
+
+def end(stats: QueryStats, token):
+    _current.reset(token)
+    counters.incr("requests")
+    request_seconds.observe(stats.seconds)
+    request_queries.observe(stats.count)
+
+# Fail when the block runs more than `limit` queries, in any thread. For tests and
+# benchmarks of query fan-out:
+#   with query_stats.max_queries(2):
+#       client.get("/admins/assessments")
+@contextmanager
+def max_queries(limit: int):
+    install()
+    collector = QueryStats(keep_statements=True)
+    _collectors.append(collector)
+    try:
+        yield collector
+    finally:
+        _collectors.remove(collector)
+    if collector.count > limit:
+        raise AssertionError(f"{collector.count} queries executed, at most {limit} expected:\n" + "\n".join(collector.statements))
+
+def get_stats():
+    return {
+        "slow_query_ms": settings.SLOW_QUERY_MS,
+        **counters.snapshot(),
+        "request_db_seconds": request_seconds.snapshot(),
+        "request_queries": request_queries.snapshot(),
+    }
@@ -0,0 +1,54 @@
+from sqlalchemy import lambda_stmt, select
+from . import models
+
+# Read repository for the hot GET endpoints. Statements select just the columns the
+# response needs with Core select() and come back as Rows (named tuples): no ORM
+# instances, identity map or relationship state is built for them.
+# List statements are built once at import and pages derived from them generatively;
+# single-row lookups are lambda statements, so even their construction is cached and
+# only the id is bound per call. Either way SQLAlchemy compiles each shape once per
+# engine. Single rows carry version and updated_at for the conditional request
+# validators (see conditional.py).
+
+FACULTY = select(models.Instructor.id, models.Instructor.name)
+DEGREE_PROGRAMS = select(models.AcadProgram.id, models.AcadProgram.acad_name)
+COURSES = select(models.Course.id, models.Course.code, models.Course.title)
+CLASSES = COURSES.join(models.Teach)
+
+def faculty(page):
+    return page.apply(FACULTY, models.Instructor.name, models.Instructor.id)
+
+def degree_programs(page):
+    return page.apply(DEGREE_PROGRAMS, models.AcadProgram.id)
+
+def classes(page, instructor_id):
+    return page.apply(CLASSES.where(models.Teach.instructor_id == instructor_id), models.Course.id)
+
+def course(course_id):
+    return lambda_stmt(lambda: select(
+        models.Course.id, models.Course.code, models.Course.title, models.Course.version, models.Course.updated_at,
+    ).where(models.Course.id == course_id))
+
+def instructor(instructor_id):
+    return lambda_stmt(lambda: select(
+        models.Instructor.id, models.Instructor.name, models.Instructor.version, models.Instructor.updated_at,
+    ).where(models.Instructor.id == instructor_id))
+
+def acad_program(acad_program_id):
+    return lambda_stmt(lambda: select(
+        models.AcadProgram.id, models.AcadProgram.acad_name, models.AcadProgram.version, models.AcadProgram.updated_at,
+    ).where(models.AcadProgram.id == acad_program_id))
+
+def fetch_page(db, page, statement):
+    return page.finish(db.execute(statement).all())
+
+async def fetch_page_async(db, page, statement):
+    result = await db.execute(statement)
+    return page.finish(result.all())
+
+def fetch_one(db, statement):
+    return db.execute(statement).first()
+
+async def fetch_one_async(db, statement):
+    result = await db.execute(statement)
+    return result.first()
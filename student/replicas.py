@@ -0,0 +1,208 @@
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import Request, Response
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from . import database, response_cache
+from .config import settings
+from .metrics import Counters
+
+# Read replicas for GET endpoints. Handlers that can tolerate replication lag take
+# get_read_db / get_async_read_db instead of get_db: the session is bound to the next
+# healthy replica in round-robin order, or to the primary when no replica is healthy
+# or the client wrote recently (read-your-writes). The write time travels with the
+# client, as a short-lived cookie plus an X-Last-Write response header that
+# non-browser clients can echo back, so it holds whichever worker serves the next
+# read and never lumps together clients behind the same proxy.
+# A background thread re-checks every replica each REPLICA_HEALTH_INTERVAL seconds;
+# a replica that fails a query is taken out of rotation until it passes a check.
+
+logger = logging.getLogger(__name__)
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = create_engine(url.replace("postgres://", "postgresql://", 1), **database.get_engine_options())
+        self.async_engine = None
+        if settings.DB_ASYNC:
+            self.async_engine = create_async_engine(database.to_async_url(url), **database.get_engine_options(is_async=True))
+        self.healthy = True
+        self.last_error = None
+
+    def mark_down(self, error):
+        if self.healthy:
+            logger.warning("Replica %s taken out of rotation: %s", self.engine.url.render_as_string(hide_password=True), error)
+        self.healthy = False
+        self.last_error = str(error)
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+        except Exception as error:
+            self.mark_down(error)
+            return
+        if not self.healthy:
+            logger.info("Replica %s back in rotation", self.engine.url.render_as_string(hide_password=True))
+        self.healthy = True
+        self.last_error = None
+
+replicas = [Replica(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+counters = Counters("replica_reads", "primary_reads", "read_your_writes", "no_healthy_replica", "replica_errors")
+_next = itertools.count()
+_stop = threading.Event()
+_thread = None
+
+def enabled():
+    return bool(replicas)
+
+# Next healthy replica in round-robin order, None if there is none
+def pick():
+    start = next(_next)
+    for i in range(len(replicas)):
+        replica = replicas[(start + i) % len(replicas)]
+        if replica.healthy:
+            return replica
+    return None
+
+WRITE_COOKIE = "last_write"
+WRITE_HEADER = "X-Last-Write"
+
+# Called on the response of a successful write: route this client's reads to the primary for a while
+def note_write(response: Response):
+    # Truncated, not rounded: a marker in the future would be rejected below
+    written_at = f"{math.floor(time.time() * 1000) / 1000:.3f}"
+    response.headers[WRITE_HEADER] = written_at
+    response.set_cookie(WRITE_COOKIE, written_at, max_age=math.ceil(settings.READ_YOUR_WRITES_SECONDS), httponly=True, samesite="lax")
+
+def wrote_recently(request: Request):
+    value = request.headers.get(WRITE_HEADER) or request.cookies.get(WRITE_COOKIE)
+    try:
+        written_at = float(value)
+    except (TypeError, ValueError):
+        return False
+    return 0 <= time.time() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+def _choose(request: Request):
+    if not replicas:
+        return None
+    if wrote_recently(request):
+        counters.incr("read_your_writes")
+        return None
+    replica = pick()
+    if replica is None:
+        counters.incr("no_healthy_replica")
+    return replica
+
+def _failed(replica, error):
+    counters.incr("replica_errors")
+    replica.mark_down(error)
+
+@contextmanager
+def _read_session(replica):
+    if replica is None:
+        counters.incr("primary_reads")
+        db = database.SessionLocal()
+    else:
+        counters.incr("replica_reads")
+        db = database.SessionLocal(bind=replica.engine)
+    try:
+        yield db
+    except exc.OperationalError as error:
+        if replica is not None:
+            _failed(replica, error)
+        raise
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def _async_read_session(replica):
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled, set DB_ASYNC=true")
+    if replica is None:
+        counters.incr("primary_reads")
+        session = database.AsyncSessionLocal()
+    else:
+        counters.incr("replica_reads")
+        session = database.AsyncSessionLocal(bind=replica.async_engine)
+    async with session as db:
+        try:
+            yield db
+        except exc.OperationalError as error:
+            if replica is not None:
+                _failed(replica, error)
+            raise
+
+# Dependency to get a read-only session, on a replica when one is available
+def get_read_db(request: Request):
+    with _read_session(_choose(request)) as db:
+        yield db
+
+# Async twin of get_read_db
+async def get_async_read_db(request: Request):
+    async with _async_read_session(_choose(request)) as db:
+        yield db
+
+# For loaders of the response cache: the primary while a cache backend is active, since
+# a replica still behind a write would refill the entry that write just invalidated
+# with the old data for the whole TTL; a replica as usual when the cache is off
+def _choose_for_cache(request: Request):
+    if response_cache.backend is not None:
+        return None
+    return _choose(request)
+
+def get_cache_read_db(request: Request):
+    with _read_session(_choose_for_cache(request)) as db:
+        yield db
+
+async def get_async_cache_read_db(request: Request):
+    async with _async_read_session(_choose_for_cache(request)) as db:
+        yield db
+
+def _run():
+    while not _stop.wait(settings.REPLICA_HEALTH_INTERVAL):
+        for replica in replicas:
+            replica.check()
+
+def start():
+    global _thread
+    if not replicas or _thread is not None:
+        return
+    for replica in replicas:
+        replica.check()
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="replica-health", daemon=True)
+    _thread.start()
+
+def stop():
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join()
+    _thread = None
+
+# See database.dispose_after_fork
+def dispose_after_fork():
+    for replica in replicas:
+        replica.engine.dispose(close=False)
+        if replica.async_engine is not None:
+            replica.async_engine.sync_engine.dispose(close=False)
+
+def get_stats():
+    return {
+        "replicas": [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": replica.healthy,
+                "last_error": replica.last_error,
+                "pool": database.pool_status(replica.engine.pool),
+            }
+            for replica in replicas
+        ],
+        "read_your_writes_seconds": settings.READ_YOUR_WRITES_SECONDS,
+        **counters.snapshot(),
+    }
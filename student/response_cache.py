@@ -0,0 +1,253 @@
+import hashlib
+import json
+import logging
+import socket
+import threading
+from urllib.parse import urlsplit
+from anyio import to_thread
+from fastapi import Request, Response, status
+from . import conditional, serialization
+from .cache import TTLCache
+from .config import settings
+from .metrics import Counters
+
+# Response cache for rarely changing catalog endpoints. Entries hold the serialized
+# JSON body (plus its ETag and pagination headers), so a hit skips the database and
+# serialization. Versioned rows (single resources) use their row version as ETag
+# plus Last-Modified, lists a hash of the body; a matching If-None-Match or
+# If-Modified-Since is answered with 304 Not Modified, on a miss before serializing.
+# Single resources are keyed by id ("course:7") and deleted when the row changes;
+# list pages are keyed by URL under a namespace generation ("faculty:3:/admins/faculty?limit=50")
+# that writers bump, orphaning every cached page of that list at once.
+# Backends: "local" (in-process LRU, per worker), "redis" (any server speaking the
+# Redis protocol, shared by all workers) or "none".
+# Loaders must not read a replica while a backend is active: one still behind a write
+# would refill the entry that write just invalidated with the old data. Their endpoints
+# take replicas.get_cache_read_db, which reads the primary unless the cache is off.
+
+logger = logging.getLogger(__name__)
+
+counters = Counters("hits", "misses", "not_modified", "invalidations", "errors")
+
+class LocalBackend:
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize, ttl)
+        self.generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def delete(self, key):
+        self.entries.invalidate(key)
+
+    def generation(self, namespace):
+        return self.generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+# Minimal Redis protocol (RESP) client: GET / SET PX / DEL / INCR on one connection per thread
+class RedisBackend:
+    blocking = True
+
+    def __init__(self, url: str, ttl: float):
+        parts = urlsplit(url)
+        self.address = (parts.hostname or "localhost", parts.port or 6379)
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.ttl_ms = int(ttl * 1000)
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=1.0)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock, self._local.reader = sock, sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def _read(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind in (b"+", b":"):
+            return int(payload) if kind == b":" else payload
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"-":
+            raise RuntimeError(payload.decode())
+        raise ConnectionError(f"Unexpected reply {line!r}")
+
+    def _call(self, *args):
+        parts = [str(arg).encode() if not isinstance(arg, bytes) else arg for arg in args]
+        command = b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(part), part) for part in parts)
+        self._local.sock.sendall(command)
+        return self._read()
+
+    def _command(self, *args):
+        # One reconnect attempt, e.g. after the server restarted
+        for attempt in (0, 1):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                return self._call(*args)
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt:
+                    raise
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = self._local.reader = None
+
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, value):
+        self._command("SET", key, value, "PX", self.ttl_ms)
+
+    def delete(self, key):
+        self._command("DEL", key)
+
+    def generation(self, namespace):
+        return int(self._command("GET", f"gen:{namespace}") or 0)
+
+    def bump(self, namespace):
+        self._command("INCR", f"gen:{namespace}")
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.RESPONSE_CACHE_URL, settings.RESPONSE_CACHE_TTL)
+    if settings.RESPONSE_CACHE_BACKEND == "local":
+        if settings.WEB_CONCURRENCY > 1:
+            # Other workers would keep serving entries this worker invalidated
+            logger.warning("Local response cache disabled with %d workers, set RESPONSE_CACHE_BACKEND=redis", settings.WEB_CONCURRENCY)
+            return None
+        return LocalBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL)
+    return None
+
+backend = _create_backend()
+
+def _etag(body: bytes):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _pack(body: bytes, headers: dict):
+    return json.dumps(headers).encode() + b"\n" + body
+
+def _unpack(entry: bytes):
+    headers, _, body = entry.partition(b"\n")
+    return body, json.loads(headers)
+
+def _guarded(operation, *args):
+    # A cache outage degrades to uncached responses
+    try:
+        return operation(*args)
+    except Exception as error:
+        counters.incr("errors")
+        logger.warning("Response cache %s failed: %s", operation.__name__, error)
+        return None
+
+def _key(request: Request, namespace: str, key):
+    if key is not None:
+        return f"{namespace}:{key}"
+    generation = _guarded(backend.generation, namespace) or 0
+    return f"{namespace}:{generation}:{request.url.path}?{request.url.query}"
+
+def _lookup(request: Request, namespace: str, key):
+    cache_key = _key(request, namespace, key)
+    return cache_key, _guarded(backend.get, cache_key)
+
+def _store(cache_key, body, headers):
+    _guarded(backend.set, cache_key, _pack(body, headers))
+
+def _validators(data):
+    return conditional.validators(data) if conditional.is_versioned(data) else None
+
+def _serialize(adapter, data, response: Response, headers=None):
+    body = serialization.to_json(adapter, data)
+    headers = dict(headers or {"ETag": _etag(body)})
+    if response is not None:
+        headers.update({name: response.headers[name] for name in serialization.PAGINATION_HEADERS if name in response.headers})
+    return body, headers
+
+def _respond(request: Request, body: bytes, headers: dict):
+    headers = {**headers, "Cache-Control": "no-cache"}
+    if conditional.not_modified(request, headers):
+        counters.incr("not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Serve a cached endpoint. `load()` returns the endpoint's data on a miss and `adapter`
+# (a pydantic TypeAdapter of the response model) serializes it; pass the endpoint's
+# Response as `response` when load() sets headers on it (pagination).
+# key=None caches by URL under the namespace generation, otherwise by namespace:key.
+def respond(request: Request, namespace: str, adapter, load, key=None, response: Response = None):
+    if backend is not None:
+        cache_key, entry = _lookup(request, namespace, key)
+        if entry is not None:
+            counters.incr("hits")
+            return _respond(request, *_unpack(entry))
+        counters.incr("misses")
+    data = load()
+    headers = _validators(data)
+    if headers is not None and conditional.not_modified(request, headers):
+        return _respond(request, b"", headers)
+    body, headers = _serialize(adapter, data, response, headers)
+    if backend is not None:
+        _store(cache_key, body, headers)
+    return _respond(request, body, headers)
+
+# Async twin of respond, `load` is a coroutine function; blocking backends run in a thread
+async def respond_async(request: Request, namespace: str, adapter, load, key=None, response: Response = None):
+    if backend is not None:
+        if backend.blocking:
+            cache_key, entry = await to_thread.run_sync(_lookup, request, namespace, key)
+        else:
+            cache_key, entry = _lookup(request, namespace, key)
+        if entry is not None:
+            counters.incr("hits")
+            return _respond(request, *_unpack(entry))
+        counters.incr("misses")
+    data = await load()
+    headers = _validators(data)
+    if headers is not None and conditional.not_modified(request, headers):
+        return _respond(request, b"", headers)
+    body, headers = _serialize(adapter, data, response, headers)
+    if backend is not None:
+        if backend.blocking:
+            await to_thread.run_sync(_store, cache_key, body, headers)
+        else:
+            _store(cache_key, body, headers)
+    return _respond(request, body, headers)
+
+# Write-through invalidation, called by writers after commit:
+#   invalidate("course", 7) drops one resource, invalidate("faculty") every page of a list
+def invalidate(namespace: str, key=None):
+    if backend is None:
+        return
+    counters.incr("invalidations")
+    if key is None:
+        _guarded(backend.bump, namespace)
+    else:
+        _guarded(backend.delete, f"{namespace}:{key}")
+
+def get_stats():
+    stats = {"backend": settings.RESPONSE_CACHE_BACKEND if backend is not None else "none", "ttl": settings.RESPONSE_CACHE_TTL, **counters.snapshot()}
+    if isinstance(backend, LocalBackend):
+        stats["size"] = backend.entries.stats()["size"]
+    return stats
@@ -0,0 +1,116 @@
+import math
+from sqlalchemy import select, func, case, delete
+from . import models
+from .bulk import insert_for
+
+# Results engine. Answers are scored in SQL (normalized string match against
+# test_item.answer) and the per-student totals are kept in the test_score table:
+# new answers upsert the totals of the affected (student, test) pairs, and changes
+# to a test's items rebuild that test's rows. The gradebook reads test_score plus
+# one aggregate query for item statistics.
+
+SCORE_COLUMNS = ["test_id", "student_id", "correct", "answered"]
+
+# Distinct (test_id, test_item_id) pairs from the construct links
+def _test_items():
+    return (
+        select(models.Construct.test_id, models.Construct.test_item_id)
+        .filter(models.Construct.test_id.is_not(None))
+        .distinct()
+        .subquery()
+    )
+
+def _is_correct():
+    return case(
+        (func.lower(func.trim(models.TestAnswer.answer)) == func.lower(func.trim(models.TestItem.answer)), 1),
+        else_=0,
+    )
+
+def tests_containing_statement(test_item_ids):
+    return select(models.Construct.test_id).filter(
+        models.Construct.test_item_id.in_(test_item_ids), models.Construct.test_id.is_not(None)
+    ).distinct()
+
+def scores_statement(test_ids=None, student_ids=None):
+    items = _test_items()
+    stmt = (
+        select(items.c.test_id, models.TestAnswer.student_id, func.sum(_is_correct()), func.count())
+        .select_from(models.TestAnswer)
+        .join(items, items.c.test_item_id == models.TestAnswer.test_item_id)
+        .join(models.TestItem, models.TestItem.id == models.TestAnswer.test_item_id)
+    )
+    if test_ids is not None:
+        stmt = stmt.where(items.c.test_id.in_(test_ids))
+    if student_ids is not None:
+        stmt = stmt.where(models.TestAnswer.student_id.in_(student_ids))
+    return stmt.group_by(items.c.test_id, models.TestAnswer.student_id)
+
+def _upsert_scores(db, scores):
+    stmt = insert_for(db, models.TestScore).from_select(SCORE_COLUMNS, scores)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["test_id", "student_id"],
+        set_={"correct": stmt.excluded.correct, "answered": stmt.excluded.answered},
+    ))
+
+# Incremental refresh after answers of `student_ids` on `test_item_ids` arrived
+def refresh_student_scores(db, student_ids, test_item_ids):
+    _upsert_scores(db, scores_statement(tests_containing_statement(test_item_ids), student_ids))
+
+# Recompute every score of the given tests (answer key or item set changed)
+def rebuild_test_scores(db, test_ids):
+    db.execute(delete(models.TestScore).where(models.TestScore.test_id.in_(test_ids)))
+    _upsert_scores(db, scores_statement(test_ids))
+
+def _correlation(n, sum_x, sum_y, sum_xy, sum_yy):
+    # Pearson correlation from running sums, x is binary so sum(x^2) == sum(x)
+    denominator = (n * sum_x - sum_x ** 2) * (n * sum_yy - sum_y ** 2)
+    if n < 2 or denominator <= 0:
+        return None
+    return (n * sum_xy - sum_x * sum_y) / math.sqrt(denominator)
+
+def get_gradebook(db, test_id: int):
+    items = _test_items()
+    items_count = db.scalar(select(func.count()).select_from(items).where(items.c.test_id == test_id))
+    students = [
+        {"student_id": student_id, "correct": correct, "answered": answered, "score": round(correct / items_count, 4) if items_count else 0.0}
+        for student_id, correct, answered in db.execute(
+            select(models.TestScore.student_id, models.TestScore.correct, models.TestScore.answered)
+            .filter(models.TestScore.test_id == test_id)
+            .order_by(models.TestScore.student_id)
+        )
+    ]
+
+    # Item difficulty (share correct) and discrimination (correlation of the item with
+    # the rest of the student's score), from sums computed in one aggregate query
+    x, s = _is_correct(), models.TestScore.correct
+    item_rows = db.execute(
+        select(models.TestAnswer.test_item_id, func.count(), func.sum(x), func.sum(s), func.sum(x * s), func.sum(s * s))
+        .join(items, (items.c.test_item_id == models.TestAnswer.test_item_id) & (items.c.test_id == test_id))
+        .join(models.TestItem, models.TestItem.id == models.TestAnswer.test_item_id)
+        .join(models.TestScore, (models.TestScore.test_id == test_id) & (models.TestScore.student_id == models.TestAnswer.student_id))
+        .group_by(models.TestAnswer.test_item_id)
+        .order_by(models.TestAnswer.test_item_id)
+    )
+    item_stats = []
+    for test_item_id, n, sum_x, sum_s, sum_xs, sum_ss in item_rows:
+        # Corrected item-total: y = s - x
+        sum_y, sum_xy, sum_yy = sum_s - sum_x, sum_xs - sum_x, sum_ss - 2 * sum_xs + sum_x
+        discrimination = _correlation(n, sum_x, sum_y, sum_xy, sum_yy)
+        item_stats.append({
+            "test_item_id": test_item_id,
+            "responses": n,
+            "correct": sum_x,
+            "difficulty": round(sum_x / n, 4) if n else None,
+            "discrimination": round(discrimination, 4) if discrimination is not None else None,
+        })
+
+    distribution = [
+        {"correct": correct, "students": count}
+        for correct, count in db.execute(
+            select(models.TestScore.correct, func.count())
+            .filter(models.TestScore.test_id == test_id)
+            .group_by(models.TestScore.correct)
+            .order_by(models.TestScore.correct)
+        )
+    ]
+    return {"test_id": test_id, "items_count": items_count, "students": students, "items": item_stats, "distribution": distribution}
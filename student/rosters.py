@@ -0,0 +1,75 @@
+from sqlalchemy import select, func, delete, and_
+from . import models
+from .bulk import insert_for
+
+# Roster and teaching-load counts. course_roster holds enrolled students per
+# (course, term, sy) and instructor_load the courses and students taught per
+# (instructor, term, sy). Writers to enroll / teach refresh the affected keys in
+# the same transaction: the keys' rows are recomputed from the base tables, so
+# upserts that move a row to another term are covered too.
+
+def roster_statement(course_ids=None):
+    stmt = select(models.Enroll.course_id, models.Enroll.term, models.Enroll.sy, func.count())
+    if course_ids is not None:
+        stmt = stmt.where(models.Enroll.course_id.in_(course_ids))
+    return stmt.group_by(models.Enroll.course_id, models.Enroll.term, models.Enroll.sy)
+
+# Instructor totals, reading the students from course_roster (refresh rosters first)
+def load_statement(instructor_ids=None):
+    stmt = (
+        select(models.Teach.instructor_id, models.Teach.term, models.Teach.sy, func.count(), func.coalesce(func.sum(models.CourseRoster.students), 0))
+        .outerjoin(models.CourseRoster, and_(
+            models.CourseRoster.course_id == models.Teach.course_id,
+            models.CourseRoster.term == models.Teach.term,
+            models.CourseRoster.sy == models.Teach.sy,
+        ))
+    )
+    if instructor_ids is not None:
+        stmt = stmt.where(models.Teach.instructor_id.in_(instructor_ids))
+    return stmt.group_by(models.Teach.instructor_id, models.Teach.term, models.Teach.sy)
+
+def instructors_teaching_statement(course_ids):
+    return select(models.Teach.instructor_id).where(models.Teach.course_id.in_(course_ids)).distinct()
+
+# Replace the rows of `keys` with `totals`; the upsert keeps concurrent refreshes of the same key safe
+def _replace(db, model, key_column, keys, columns, totals):
+    db.execute(delete(model).where(key_column.in_(keys)))
+    stmt = insert_for(db, model).from_select(columns, totals)
+    if hasattr(stmt, "on_conflict_do_update"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_column.key, "term", "sy"],
+            set_={name: stmt.excluded[name] for name in columns[3:]},
+        )
+    db.execute(stmt)
+
+def refresh_course_rosters(db, course_ids):
+    _replace(db, models.CourseRoster, models.CourseRoster.course_id, course_ids,
+             ["course_id", "term", "sy", "students"], roster_statement(course_ids))
+
+def refresh_instructor_loads(db, instructor_ids):
+    _replace(db, models.InstructorLoad, models.InstructorLoad.instructor_id, instructor_ids,
+             ["instructor_id", "term", "sy", "courses", "students"], load_statement(instructor_ids))
+
+# After enroll rows of `course_ids` changed: their rosters and the loads of whoever teaches them
+def refresh_enrollments(db, course_ids):
+    course_ids = list(course_ids)
+    refresh_course_rosters(db, course_ids)
+    refresh_instructor_loads(db, instructors_teaching_statement(course_ids))
+
+# After teach rows of `instructor_ids` changed
+def refresh_teaches(db, instructor_ids):
+    refresh_instructor_loads(db, list(instructor_ids))
+
+# Refresh for rows written to `model`, if it feeds the counts
+def refresh_for(db, model, rows):
+    if model is models.Enroll:
+        refresh_enrollments(db, {row["course_id"] for row in rows})
+    elif model is models.Teach:
+        refresh_teaches(db, {row["instructor_id"] for row in rows})
+
+# Recompute everything (backfill, or repair after writes outside the app)
+def rebuild(db):
+    db.execute(delete(models.InstructorLoad))
+    db.execute(delete(models.CourseRoster))
+    db.execute(insert_for(db, models.CourseRoster).from_select(["course_id", "term", "sy", "students"], roster_statement()))
+    db.execute(insert_for(db, models.InstructorLoad).from_select(["instructor_id", "term", "sy", "courses", "students"], load_statement()))
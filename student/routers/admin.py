@@ -1,48 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
-from .. import models, schemas, oauth2, utils
+from typing import List, Optional
+from .. import models, schemas, oauth2, hashing, importer, rosters, response_cache, conditional, serialization, reads
+from ..pagination import Page, get_page
+from ..loaders import load_assessments
 from ..database import get_db
+from ..replicas import get_cache_read_db
 
 router = APIRouter(
     prefix="/admins",
     tags=['Admins']
 )
 
+# Serializers for the cached catalog endpoints. Their loaders take get_cache_read_db:
+# the primary while the response cache is on, a replica otherwise.
+course_adapter = serialization.adapter(schemas.Course)
+instructor_adapter = serialization.adapter(schemas.Instructor)
+acad_program_adapter = serialization.adapter(schemas.AcadProgram)
+faculty_adapter = serialization.adapter(List[schemas.Instructor])
+degree_programs_adapter = serialization.adapter(List[schemas.AcadProgram])
+
 # User Login
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = oauth2.authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await oauth2.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = oauth2.create_access_token(data={"sub": user.username})
+    access_token = oauth2.create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Get Current User
 @router.get("/me", response_model=schemas.UserOut)
 def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     return user
 
 # Edit User Credentials
 @router.put("/me", response_model=schemas.UserOut)
-def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_user = db.query(models.User).filter(models.User.id == user.id).first()
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    db_user.username = user_update.username
-    db_user.password = utils.get_password_hash(user_update.password)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(oauth2.get_current_principal, db, token)
+    hashed_password = await hashing.get_password_hash_async(user_update.password)
+    return await run_in_threadpool(oauth2.update_credentials, db, user, user_update.username, hashed_password)
 
 # View Assessment
 @router.get("/assessments", response_model=List[schemas.Assessment])
-def view_assessments(db: Session = Depends(get_db)):
-    assessments = db.query(models.Test).all()
-    return assessments
+def view_assessments(page: Page = Depends(get_page), db: Session = Depends(get_db)):
+    tests = page.finish(page.apply(db.query(models.Test), models.Test.id).all())
+    return load_assessments(db, tests)
 
 # Add Class
 @router.post("/classes", response_model=schemas.Course)
@@ -55,12 +61,16 @@ def add_class(course: schemas.CourseCreate, db: Session = Depends(get_db)):
 
 # Edit/Update Class
 @router.put("/classes/{class_id}", response_model=schemas.Course)
-def update_class(class_id: int, class_update: schemas.CourseCreate, db: Session = Depends(get_db)):
+def update_class(class_id: int, class_update: schemas.CourseCreate, request: Request, response: Response, db: Session = Depends(get_db)):
     db_class = db.query(models.Course).filter(models.Course.id == class_id).first()
     if db_class is None:
         raise HTTPException(status_code=404, detail="Class not found")
-    db_class.update(class_update.dict())
+    conditional.check_if_match(request, db_class)
+    for key, value in class_update.dict().items():
+        setattr(db_class, key, value)
     db.commit()
+    response_cache.invalidate("course", class_id)
+    conditional.set_validators(response, db_class)
     return db_class
 
 # Delete Class
@@ -71,15 +81,18 @@ def delete_class(class_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Class not found")
     db.delete(db_class)
     db.commit()
+    response_cache.invalidate("course", class_id)
     return {"message": "Class deleted"}
 
 # View Class
 @router.get("/classes/{class_id}", response_model=schemas.Course)
-def view_class(class_id: int, db: Session = Depends(get_db)):
-    db_class = db.query(models.Course).filter(models.Course.id == class_id).first()
-    if db_class is None:
-        raise HTTPException(status_code=404, detail="Class not found")
-    return db_class
+def view_class(class_id: int, request: Request, db: Session = Depends(get_cache_read_db)):
+    def load():
+        db_class = reads.fetch_one(db, reads.course(class_id))
+        if db_class is None:
+            raise HTTPException(status_code=404, detail="Class not found")
+        return db_class
+    return response_cache.respond(request, "course", course_adapter, load, key=class_id)
 
 # Add Instructor
 @router.post("/instructors", response_model=schemas.Instructor)
@@ -87,17 +100,23 @@ def add_instructor(instructor: schemas.InstructorCreate, db: Session = Depends(g
     new_instructor = models.Instructor(**instructor.dict())
     db.add(new_instructor)
     db.commit()
+    response_cache.invalidate("faculty")
     db.refresh(new_instructor)
     return new_instructor
 
 # Edit/Update Instructor
 @router.put("/instructors/{instructor_id}", response_model=schemas.Instructor)
-def update_instructor(instructor_id: int, instructor_update: schemas.InstructorCreate, db: Session = Depends(get_db)):
+def update_instructor(instructor_id: int, instructor_update: schemas.InstructorCreate, request: Request, response: Response, db: Session = Depends(get_db)):
     db_instructor = db.query(models.Instructor).filter(models.Instructor.id == instructor_id).first()
     if db_instructor is None:
         raise HTTPException(status_code=404, detail="Instructor not found")
-    db_instructor.update(instructor_update.dict())
+    conditional.check_if_match(request, db_instructor)
+    for key, value in instructor_update.dict().items():
+        setattr(db_instructor, key, value)
     db.commit()
+    response_cache.invalidate("faculty")
+    response_cache.invalidate("instructor", instructor_id)
+    conditional.set_validators(response, db_instructor)
     return db_instructor
 
 # Delete Instructor
@@ -108,23 +127,33 @@ def delete_instructor(instructor_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Instructor not found")
     db.delete(db_instructor)
     db.commit()
+    response_cache.invalidate("faculty")
+    response_cache.invalidate("instructor", instructor_id)
     return {"message": "Instructor deleted"}
 
+# View Instructor
+@router.get("/instructors/{instructor_id}", response_model=schemas.Instructor)
+def view_instructor(instructor_id: int, request: Request, db: Session = Depends(get_cache_read_db)):
+    def load():
+        db_instructor = reads.fetch_one(db, reads.instructor(instructor_id))
+        if db_instructor is None:
+            raise HTTPException(status_code=404, detail="Instructor not found")
+        return db_instructor
+    return response_cache.respond(request, "instructor", instructor_adapter, load, key=instructor_id)
+
 # View Faculty
 @router.get("/faculty", response_model=List[schemas.Instructor])
-def view_faculty(db: Session = Depends(get_db)):
-    faculty = db.query(models.Instructor).order_by(models.Instructor.name).all()
-    return faculty
+def view_faculty(request: Request, page: Page = Depends(get_page), db: Session = Depends(get_cache_read_db)):
+    def load():
+        return reads.fetch_page(db, page, reads.faculty(page))
+    return response_cache.respond(request, "faculty", faculty_adapter, load, response=page.response)
 
 # Create Login Credentials for Instructor
 @router.post("/instructors/credentials", response_model=schemas.UserOut)
-def create_instructor_credentials(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_instructor_credentials(user: schemas.UserCreate, db: Session = Depends(get_db)):
     new_user = models.User(**user.dict())
-    new_user.password = utils.get_password_hash(user.password)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    new_user.password = await hashing.get_password_hash_async(user.password)
+    return await run_in_threadpool(oauth2.add_user, db, new_user)
 
 # Add Academic Program
 @router.post("/acad_programs", response_model=schemas.AcadProgram)
@@ -132,17 +161,23 @@ def add_acad_program(acad_program: schemas.AcadProgramCreate, db: Session = Depe
     new_acad_program = models.AcadProgram(**acad_program.dict())
     db.add(new_acad_program)
     db.commit()
+    response_cache.invalidate("degree_programs")
     db.refresh(new_acad_program)
     return new_acad_program
 
 # Edit/Update Academic Program
 @router.put("/acad_programs/{acad_program_id}", response_model=schemas.AcadProgram)
-def update_acad_program(acad_program_id: int, acad_program_update: schemas.AcadProgramCreate, db: Session = Depends(get_db)):
+def update_acad_program(acad_program_id: int, acad_program_update: schemas.AcadProgramCreate, request: Request, response: Response, db: Session = Depends(get_db)):
     db_acad_program = db.query(models.AcadProgram).filter(models.AcadProgram.id == acad_program_id).first()
     if db_acad_program is None:
         raise HTTPException(status_code=404, detail="Academic program not found")
-    db_acad_program.update(acad_program_update.dict())
+    conditional.check_if_match(request, db_acad_program)
+    for key, value in acad_program_update.dict().items():
+        setattr(db_acad_program, key, value)
     db.commit()
+    response_cache.invalidate("degree_programs")
+    response_cache.invalidate("acad_program", acad_program_id)
+    conditional.set_validators(response, db_acad_program)
     return db_acad_program
 
 # Delete Academic Program
@@ -153,13 +188,26 @@ def delete_acad_program(acad_program_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Academic program not found")
     db.delete(db_acad_program)
     db.commit()
+    response_cache.invalidate("degree_programs")
+    response_cache.invalidate("acad_program", acad_program_id)
     return {"message": "Academic program deleted"}
 
+# View Academic Program
+@router.get("/acad_programs/{acad_program_id}", response_model=schemas.AcadProgram)
+def view_acad_program(acad_program_id: int, request: Request, db: Session = Depends(get_cache_read_db)):
+    def load():
+        db_acad_program = reads.fetch_one(db, reads.acad_program(acad_program_id))
+        if db_acad_program is None:
+            raise HTTPException(status_code=404, detail="Academic program not found")
+        return db_acad_program
+    return response_cache.respond(request, "acad_program", acad_program_adapter, load, key=acad_program_id)
+
 # View Degree Programs
 @router.get("/degree_programs", response_model=List[schemas.AcadProgram])
-def view_degree_programs(db: Session = Depends(get_db)):
-    degree_programs = db.query(models.AcadProgram).all()
-    return degree_programs
+def view_degree_programs(request: Request, page: Page = Depends(get_page), db: Session = Depends(get_cache_read_db)):
+    def load():
+        return reads.fetch_page(db, page, reads.degree_programs(page))
+    return response_cache.respond(request, "degree_programs", degree_programs_adapter, load, response=page.response)
 
 # Add Course
 @router.post("/courses", response_model=schemas.Course)
@@ -172,12 +220,16 @@ def add_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
 
 # Edit/Update Course
 @router.put("/courses/{course_id}", response_model=schemas.Course)
-def update_course(course_id: int, course_update: schemas.CourseCreate, db: Session = Depends(get_db)):
+def update_course(course_id: int, course_update: schemas.CourseCreate, request: Request, response: Response, db: Session = Depends(get_db)):
     db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
-    db_course.update(course_update.dict())
+    conditional.check_if_match(request, db_course)
+    for key, value in course_update.dict().items():
+        setattr(db_course, key, value)
     db.commit()
+    response_cache.invalidate("course", course_id)
+    conditional.set_validators(response, db_course)
     return db_course
 
 # Delete Course
@@ -188,12 +240,63 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Course not found")
     db.delete(db_course)
     db.commit()
+    response_cache.invalidate("course", course_id)
     return {"message": "Course deleted"}
 
 # View Course
 @router.get("/courses/{course_id}", response_model=schemas.Course)
-def view_course(course_id: int, db: Session = Depends(get_db)):
-    db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if db_course is None:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return db_course
+def view_course(course_id: int, request: Request, db: Session = Depends(get_cache_read_db)):
+    def load():
+        db_course = reads.fetch_one(db, reads.course(course_id))
+        if db_course is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return db_course
+    return response_cache.respond(request, "course", course_adapter, load, key=course_id)
+
+# Bulk Import of students, enrollments, offers or teaches (CSV or NDJSON upload)
+@router.post("/imports/{target}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.ImportJob)
+def start_import(target: str, background_tasks: BackgroundTasks, file: UploadFile = File(...), format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    if target not in importer.IMPORT_TARGETS:
+        raise HTTPException(status_code=404, detail=f"Unknown import target, expected one of: {', '.join(importer.IMPORT_TARGETS)}")
+    fmt = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    job = importer.create_job(target, file.file, fmt)
+    background_tasks.add_task(importer.run_job, job)
+    return job.as_dict()
+
+# Bulk Import Progress
+@router.get("/imports/{job_id}", response_model=schemas.ImportJob)
+def import_status(job_id: str):
+    job = importer.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+# Course Rosters (enrolled students per course and term)
+@router.get("/rosters", response_model=List[schemas.CourseRoster])
+def view_rosters(term: Optional[str] = None, sy: Optional[str] = None, course_id: Optional[int] = None, page: Page = Depends(get_page), db: Session = Depends(get_db)):
+    query = db.query(models.CourseRoster)
+    if term is not None:
+        query = query.filter(models.CourseRoster.term == term)
+    if sy is not None:
+        query = query.filter(models.CourseRoster.sy == sy)
+    if course_id is not None:
+        query = query.filter(models.CourseRoster.course_id == course_id)
+    return page.finish(page.apply(query, models.CourseRoster.course_id, models.CourseRoster.sy, models.CourseRoster.term).all())
+
+# Teaching Load per Instructor and term
+@router.get("/teaching_loads", response_model=List[schemas.InstructorLoad])
+def view_teaching_loads(term: Optional[str] = None, sy: Optional[str] = None, instructor_id: Optional[int] = None, page: Page = Depends(get_page), db: Session = Depends(get_db)):
+    query = db.query(models.InstructorLoad)
+    if term is not None:
+        query = query.filter(models.InstructorLoad.term == term)
+    if sy is not None:
+        query = query.filter(models.InstructorLoad.sy == sy)
+    if instructor_id is not None:
+        query = query.filter(models.InstructorLoad.instructor_id == instructor_id)
+    return page.finish(page.apply(query, models.InstructorLoad.instructor_id, models.InstructorLoad.sy, models.InstructorLoad.term).all())
+
+# Recompute Rosters and Teaching Loads from enrollments and teaches
+@router.post("/rosters/refresh", status_code=status.HTTP_204_NO_CONTENT)
+def refresh_rosters(db: Session = Depends(get_db)):
+    rosters.rebuild(db)
+    db.commit()
@@ -0,0 +1,243 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .. import models, schemas, oauth2, hashing, response_cache, conditional, reads
+from ..database import get_async_db
+from ..replicas import get_async_cache_read_db
+from ..pagination import Page, get_page
+from ..loaders import load_assessments_async
+from .admin import course_adapter, instructor_adapter, acad_program_adapter, faculty_adapter, degree_programs_adapter
+
+# Async twin of routers/admin.py, mounted ahead of it when DB_ASYNC is enabled
+router = APIRouter(
+    prefix="/admins",
+    tags=['Admins']
+)
+
+# Fetch one row by primary key or raise 404
+async def get_or_404(db: AsyncSession, model, pk: int, detail: str):
+    obj = await db.get(model, pk)
+    if obj is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return obj
+
+# Fetch one Core row of a read statement (reads.py) or raise 404
+async def row_or_404(db: AsyncSession, statement, detail: str):
+    row = await reads.fetch_one_async(db, statement)
+    if row is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return row
+
+# User Login
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.authenticate_user_async(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    access_token = oauth2.create_user_token(user)
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# Get Current User
+@router.get("/me", response_model=schemas.UserOut)
+async def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    return user
+
+# Edit User Credentials
+@router.put("/me", response_model=schemas.UserOut)
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_user = await get_or_404(db, models.User, user.id, "User not found")
+    db_user.username = user_update.username
+    db_user.password = await hashing.get_password_hash_async(user_update.password)
+    await db.commit()
+    await db.refresh(db_user)
+    oauth2.revoke_user_tokens(db_user.id, getattr(db_user, "token_version", None) or 0)
+    oauth2.invalidate_user(user.username, db_user.username)
+    return db_user
+
+# View Assessment
+@router.get("/assessments", response_model=List[schemas.Assessment])
+async def view_assessments(page: Page = Depends(get_page), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(page.apply(select(models.Test), models.Test.id))
+    return await load_assessments_async(db, page.finish(result.scalars().all()))
+
+# Add Class
+@router.post("/classes", response_model=schemas.Course)
+async def add_class(course: schemas.CourseCreate, db: AsyncSession = Depends(get_async_db)):
+    new_course = models.Course(**course.dict())
+    db.add(new_course)
+    await db.commit()
+    await db.refresh(new_course)
+    return new_course
+
+# Edit/Update Class
+@router.put("/classes/{class_id}", response_model=schemas.Course)
+async def update_class(class_id: int, class_update: schemas.CourseCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_class = await get_or_404(db, models.Course, class_id, "Class not found")
+    conditional.check_if_match(request, db_class)
+    for key, value in class_update.dict().items():
+        setattr(db_class, key, value)
+    await db.commit()
+    response_cache.invalidate("course", class_id)
+    conditional.set_validators(response, db_class)
+    return db_class
+
+# Delete Class
+@router.delete("/classes/{class_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_class(class_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_class = await get_or_404(db, models.Course, class_id, "Class not found")
+    await db.delete(db_class)
+    await db.commit()
+    response_cache.invalidate("course", class_id)
+    return {"message": "Class deleted"}
+
+# View Class
+@router.get("/classes/{class_id}", response_model=schemas.Course)
+async def view_class(class_id: int, request: Request, db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await row_or_404(db, reads.course(class_id), "Class not found")
+    return await response_cache.respond_async(request, "course", course_adapter, load, key=class_id)
+
+# Add Instructor
+@router.post("/instructors", response_model=schemas.Instructor)
+async def add_instructor(instructor: schemas.InstructorCreate, db: AsyncSession = Depends(get_async_db)):
+    new_instructor = models.Instructor(**instructor.dict())
+    db.add(new_instructor)
+    await db.commit()
+    response_cache.invalidate("faculty")
+    await db.refresh(new_instructor)
+    return new_instructor
+
+# Edit/Update Instructor
+@router.put("/instructors/{instructor_id}", response_model=schemas.Instructor)
+async def update_instructor(instructor_id: int, instructor_update: schemas.InstructorCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_instructor = await get_or_404(db, models.Instructor, instructor_id, "Instructor not found")
+    conditional.check_if_match(request, db_instructor)
+    for key, value in instructor_update.dict().items():
+        setattr(db_instructor, key, value)
+    await db.commit()
+    response_cache.invalidate("faculty")
+    response_cache.invalidate("instructor", instructor_id)
+    conditional.set_validators(response, db_instructor)
+    return db_instructor
+
+# Delete Instructor
+@router.delete("/instructors/{instructor_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_instructor(instructor_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_instructor = await get_or_404(db, models.Instructor, instructor_id, "Instructor not found")
+    await db.delete(db_instructor)
+    await db.commit()
+    response_cache.invalidate("faculty")
+    response_cache.invalidate("instructor", instructor_id)
+    return {"message": "Instructor deleted"}
+
+# View Instructor
+@router.get("/instructors/{instructor_id}", response_model=schemas.Instructor)
+async def view_instructor(instructor_id: int, request: Request, db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await row_or_404(db, reads.instructor(instructor_id), "Instructor not found")
+    return await response_cache.respond_async(request, "instructor", instructor_adapter, load, key=instructor_id)
+
+# View Faculty
+@router.get("/faculty", response_model=List[schemas.Instructor])
+async def view_faculty(request: Request, page: Page = Depends(get_page), db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await reads.fetch_page_async(db, page, reads.faculty(page))
+    return await response_cache.respond_async(request, "faculty", faculty_adapter, load, response=page.response)
+
+# Create Login Credentials for Instructor
+@router.post("/instructors/credentials", response_model=schemas.UserOut)
+async def create_instructor_credentials(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    new_user = models.User(**user.dict())
+    new_user.password = await hashing.get_password_hash_async(user.password)
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    return new_user
+
+# Add Academic Program
+@router.post("/acad_programs", response_model=schemas.AcadProgram)
+async def add_acad_program(acad_program: schemas.AcadProgramCreate, db: AsyncSession = Depends(get_async_db)):
+    new_acad_program = models.AcadProgram(**acad_program.dict())
+    db.add(new_acad_program)
+    await db.commit()
+    response_cache.invalidate("degree_programs")
+    await db.refresh(new_acad_program)
+    return new_acad_program
+
+# Edit/Update Academic Program
+@router.put("/acad_programs/{acad_program_id}", response_model=schemas.AcadProgram)
+async def update_acad_program(acad_program_id: int, acad_program_update: schemas.AcadProgramCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_acad_program = await get_or_404(db, models.AcadProgram, acad_program_id, "Academic program not found")
+    conditional.check_if_match(request, db_acad_program)
+    for key, value in acad_program_update.dict().items():
+        setattr(db_acad_program, key, value)
+    await db.commit()
+    response_cache.invalidate("degree_programs")
+    response_cache.invalidate("acad_program", acad_program_id)
+    conditional.set_validators(response, db_acad_program)
+    return db_acad_program
+
+# Delete Academic Program
+@router.delete("/acad_programs/{acad_program_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_acad_program(acad_program_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_acad_program = await get_or_404(db, models.AcadProgram, acad_program_id, "Academic program not found")
+    await db.delete(db_acad_program)
+    await db.commit()
+    response_cache.invalidate("degree_programs")
+    response_cache.invalidate("acad_program", acad_program_id)
+    return {"message": "Academic program deleted"}
+
+# View Academic Program
+@router.get("/acad_programs/{acad_program_id}", response_model=schemas.AcadProgram)
+async def view_acad_program(acad_program_id: int, request: Request, db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await row_or_404(db, reads.acad_program(acad_program_id), "Academic program not found")
+    return await response_cache.respond_async(request, "acad_program", acad_program_adapter, load, key=acad_program_id)
+
+# View Degree Programs
+@router.get("/degree_programs", response_model=List[schemas.AcadProgram])
+async def view_degree_programs(request: Request, page: Page = Depends(get_page), db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await reads.fetch_page_async(db, page, reads.degree_programs(page))
+    return await response_cache.respond_async(request, "degree_programs", degree_programs_adapter, load, response=page.response)
+
+# Add Course
+@router.post("/courses", response_model=schemas.Course)
+async def add_course(course: schemas.CourseCreate, db: AsyncSession = Depends(get_async_db)):
+    new_course = models.Course(**course.dict())
+    db.add(new_course)
+    await db.commit()
+    await db.refresh(new_course)
+    return new_course
+
+# Edit/Update Course
+@router.put("/courses/{course_id}", response_model=schemas.Course)
+async def update_course(course_id: int, course_update: schemas.CourseCreate, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    db_course = await get_or_404(db, models.Course, course_id, "Course not found")
+    conditional.check_if_match(request, db_course)
+    for key, value in course_update.dict().items():
+        setattr(db_course, key, value)
+    await db.commit()
+    response_cache.invalidate("course", course_id)
+    conditional.set_validators(response, db_course)
+    return db_course
+
+# Delete Course
+@router.delete("/courses/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_course(course_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_course = await get_or_404(db, models.Course, course_id, "Course not found")
+    await db.delete(db_course)
+    await db.commit()
+    response_cache.invalidate("course", course_id)
+    return {"message": "Course deleted"}
+
+# View Course
+@router.get("/courses/{course_id}", response_model=schemas.Course)
+async def view_course(course_id: int, request: Request, db: AsyncSession = Depends(get_async_cache_read_db)):
+    async def load():
+        return await row_or_404(db, reads.course(course_id), "Course not found")
+    return await response_cache.respond_async(request, "course", course_adapter, load, key=course_id)
@@ -0,0 +1,180 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .. import models, schemas, oauth2, hashing, results, conditional, serialization, reads
+from ..database import get_async_db
+from ..replicas import get_async_read_db
+from ..pagination import Page, get_page, parse_ids
+from ..authoring import delete_tests_async
+
+# Async twin of routers/instructor.py, mounted ahead of it when DB_ASYNC is enabled
+router = APIRouter(
+    prefix="/instructors",
+    tags=['Instructors']
+)
+
+# Fetch a test owned by the instructor or raise 404
+async def get_own_test(db: AsyncSession, instructor_id: int, test_id: int):
+    result = await db.execute(
+        select(models.Test).join(models.TestCreate).filter(models.TestCreate.instructor_id == instructor_id, models.Test.id == test_id)
+    )
+    db_test = result.scalars().first()
+    if db_test is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    return db_test
+
+# Fetch a test item constructed by the instructor or raise 404
+async def get_own_test_item(db: AsyncSession, instructor_id: int, test_item_id: int):
+    result = await db.execute(
+        select(models.TestItem).join(models.Construct).filter(models.Construct.instructor_id == instructor_id, models.TestItem.id == test_item_id)
+    )
+    db_test_item = result.scalars().first()
+    if db_test_item is None:
+        raise HTTPException(status_code=404, detail="Test item not found")
+    return db_test_item
+
+# User Login
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.authenticate_user_async(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    access_token = oauth2.create_user_token(user)
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# Get Current User
+@router.get("/me", response_model=schemas.UserOut)
+async def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    return user
+
+# Edit User Credentials
+@router.put("/me", response_model=schemas.UserOut)
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_user = await db.get(models.User, user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_user.username = user_update.username
+    db_user.password = await hashing.get_password_hash_async(user_update.password)
+    await db.commit()
+    await db.refresh(db_user)
+    oauth2.revoke_user_tokens(db_user.id, getattr(db_user, "token_version", None) or 0)
+    oauth2.invalidate_user(user.username, db_user.username)
+    return db_user
+
+# View Class
+@router.get("/me/classes", response_model=List[schemas.Course])
+async def view_classes(page: Page = Depends(get_page), token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_read_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    rows = await reads.fetch_page_async(db, page, reads.classes(page, user.id))
+    return serialization.json_response(List[schemas.Course], rows, page.response)
+
+# Create Test
+@router.post("/me/tests", response_model=schemas.Test)
+async def create_test(test: schemas.TestCreate, term: str, sy: str, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    new_test = models.Test(date=test.date)
+    db.add(new_test)
+    await db.flush()
+    db.add(models.TestCreate(instructor_id=user.id, test_id=new_test.id, term=term, sy=sy))
+    await db.commit()
+    await db.refresh(new_test)
+    return new_test
+
+# Edit Test
+@router.put("/me/tests/{test_id}", response_model=schemas.Test)
+async def edit_test(test_id: int, test_update: schemas.TestCreate, request: Request, response: Response, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_test = await get_own_test(db, user.id, test_id)
+    conditional.check_if_match(request, db_test)
+    db_test.date = test_update.date
+    await db.commit()
+    await db.refresh(db_test)
+    conditional.set_validators(response, db_test)
+    return db_test
+
+# Delete Test
+@router.delete("/me/tests/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_test(test_id: int, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    await delete_tests_async(db, user.id, [test_id])
+    return {"message": "Test deleted"}
+
+# Delete Several Tests in one transaction, ids=1,2,3
+@router.delete("/me/tests", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_many_tests(ids: str, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    await delete_tests_async(db, user.id, parse_ids(ids))
+    return {"message": "Tests deleted"}
+
+# Add Test Item
+@router.post("/me/tests/{test_id}/items", response_model=schemas.TestItem)
+async def add_test_item(test_id: int, test_item: schemas.TestItemCreate, term: str, sy: str, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    new_test_item = models.TestItem(question=test_item.question, answer=test_item.answer)
+    db.add(new_test_item)
+    await db.flush()
+    db.add(models.Construct(instructor_id=user.id, test_item_id=new_test_item.id, test_id=test_id, term=term, sy=sy))
+    await db.commit()
+    await db.refresh(new_test_item)
+    return new_test_item
+
+# Edit Test Item
+@router.put("/me/tests/{test_id}/items/{test_item_id}", response_model=schemas.TestItem)
+async def edit_test_item(test_id: int, test_item_id: int, test_item_update: schemas.TestItemCreate, request: Request, response: Response, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_test_item = await get_own_test_item(db, user.id, test_item_id)
+    conditional.check_if_match(request, db_test_item)
+    db_test_item.question = test_item_update.question
+    db_test_item.answer = test_item_update.answer
+    await db.flush()
+    # The answer key may have changed
+    await db.run_sync(results.rebuild_test_scores, results.tests_containing_statement([test_item_id]))
+    await db.commit()
+    await db.refresh(db_test_item)
+    conditional.set_validators(response, db_test_item)
+    return db_test_item
+
+# Delete Test Item
+@router.delete("/me/tests/{test_id}/items/{test_item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_test_item(test_id: int, test_item_id: int, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    await get_own_test_item(db, user.id, test_item_id)
+
+    shared = await db.scalar(
+        select(func.count()).select_from(models.Construct).filter(models.Construct.test_item_id == test_item_id, models.Construct.test_id != test_id)
+    )
+    if shared > 0:
+        raise HTTPException(status_code=400, detail="Cannot delete test item as it is being used in other tests or by other instructors")
+
+    await db.execute(delete(models.Construct).filter(models.Construct.test_item_id == test_item_id))
+    await db.execute(delete(models.TestItem).filter(models.TestItem.id == test_item_id))
+    await db.run_sync(results.rebuild_test_scores, [test_id])
+    await db.commit()
+    return {"message": "Test item deleted"}
+
+# Publish Test Item
+@router.post("/me/tests/{test_id}/items/{test_item_id}/publish")
+async def publish_test_item(test_id: int, test_item_id: int, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_test_item = await get_own_test_item(db, user.id, test_item_id)
+
+    # Example logic for publishing the test item (could be making it visible to students)
+    db_test_item.published = True
+    await db.commit()
+    return {"message": "Test item published"}
+
+# Generate Test Result
+@router.get("/me/tests/{test_id}/results")
+async def generate_test_result(test_id: int, page: Page = Depends(get_page), token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    await get_own_test(db, user.id, test_id)
+
+    # Example logic for generating test results
+    query = select(models.TestTake).filter(models.TestTake.test_id == test_id)
+    result = await db.execute(page.apply(query, models.TestTake.student_id))
+    results = [schemas.Take.model_validate(take) for take in page.finish(result.scalars().all())]
+    return {"test_id": test_id, "results": results}
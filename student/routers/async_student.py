@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .. import models, schemas, oauth2, hashing, answer_buffer, results, serialization
+from ..database import get_async_db
+from ..replicas import get_async_read_db
+from ..loaders import load_student_enrollments_async
+from ..pagination import parse_ids
+
+# Async twin of routers/student.py, mounted ahead of it when DB_ASYNC is enabled
+router = APIRouter(
+    prefix="/students",
+    tags=['Students']
+)
+
+# User Login
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.authenticate_user_async(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    access_token = oauth2.create_user_token(user)
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# Get Current User
+@router.get("/me", response_model=schemas.UserOut)
+async def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    return user
+
+# Edit User Credentials
+@router.put("/me", response_model=schemas.UserOut)
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    user = await oauth2.get_current_principal_async(db, token)
+    db_user = await db.get(models.User, user.id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    db_user.username = user_update.username
+    db_user.password = await hashing.get_password_hash_async(user_update.password)
+    await db.commit()
+    await db.refresh(db_user)
+    oauth2.revoke_user_tokens(db_user.id, getattr(db_user, "token_version", None) or 0)
+    oauth2.invalidate_user(user.username, db_user.username)
+    return db_user
+
+# Take Assessment
+@router.post("/{student_id}/assessments/{test_id}/take")
+async def take_assessment(student_id: int, test_id: int, term: str, sy: str, db: AsyncSession = Depends(get_async_db)):
+    db.add(models.TestTake(student_id=student_id, test_id=test_id, term=term, sy=sy))
+    await db.commit()
+    return {"message": "Assessment started"}
+
+# Answer Test Item
+@router.post("/{student_id}/test_items/{test_item_id}/answer")
+async def answer_test_item(student_id: int, test_item_id: int, term: str, sy: str, answer: str, response: Response, db: AsyncSession = Depends(get_async_db)):
+    if answer_buffer.enabled():
+        answer_buffer.submit(student_id, test_item_id, term, sy, answer)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Answer accepted"}
+    db.add(models.TestAnswer(student_id=student_id, test_item_id=test_item_id, term=term, sy=sy, answer=answer))
+    await db.flush()
+    await db.run_sync(results.refresh_student_scores, [student_id], [test_item_id])
+    await db.commit()
+    return {"message": "Answer recorded"}
+
+# Display Enrolled Courses and Academic Program
+@router.get("/{student_id}/enrollments", response_model=schemas.StudentEnrollment)
+async def get_student_enrollments(student_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    enrollment = (await load_student_enrollments_async(db, [student_id])).get(student_id)
+    if not enrollment:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return enrollment
+
+# Display Enrollments of Several Students (e.g. a section roster), ids=1,2,3
+@router.get("/enrollments", response_model=List[schemas.StudentEnrollment])
+async def get_students_enrollments(ids: str, db: AsyncSession = Depends(get_async_db)):
+    student_ids = parse_ids(ids)
+    enrollments = await load_student_enrollments_async(db, student_ids)
+    return serialization.json_response(List[schemas.StudentEnrollment], [enrollments[student_id] for student_id in student_ids if student_id in enrollments])
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from .. import models, oauth2
+from ..exports import stream_table, MEDIA_TYPES
+
+router = APIRouter(
+    prefix="/exports",
+    tags=['Exports'],
+    # Bulk student data: admins and instructors only
+    dependencies=[Depends(oauth2.require_roles("admin", "instructor"))],
+)
+
+def export_response(model, name: str, fmt: str):
+    return StreamingResponse(
+        stream_table(model, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+# Export Enrollments
+@router.get("/enrollments")
+def export_enrollments(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return export_response(models.Enroll, "enrollments", format)
+
+# Export Test Takes
+@router.get("/test_takes")
+def export_test_takes(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return export_response(models.TestTake, "test_takes", format)
+
+# Export Test Answers
+@router.get("/test_answers")
+def export_test_answers(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return export_response(models.TestAnswer, "test_answers", format)
+
+# Export Faculty
+@router.get("/instructors")
+def export_instructors(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return export_response(models.Instructor, "instructors", format)
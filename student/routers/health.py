@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Response, status
+from .. import lifecycle
+
+router = APIRouter(
+    prefix="/health",
+    tags=['Health']
+)
+
+# Liveness: the process is serving requests
+@router.get("/live")
+def live():
+    return {"status": "ok"}
+
+# Readiness: startup checks passed and the instance is not shutting down
+@router.get("/ready")
+def ready(response: Response):
+    if not lifecycle.state["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting"}
+    return {"status": "ready"}
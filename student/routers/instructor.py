@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
-from .. import models, schemas, oauth2, utils
+from typing import List, Optional
+from .. import models, schemas, oauth2, hashing, results, conditional, serialization, reads
 from ..database import get_db
+from ..replicas import get_read_db
+from ..pagination import Page, get_page, parse_ids
+from ..authoring import delete_tests, create_test_with_items
 
 router = APIRouter(
     prefix="/instructors",
@@ -12,87 +17,104 @@ router = APIRouter(
 
 # User Login
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = oauth2.authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await oauth2.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = oauth2.create_access_token(data={"sub": user.username})
+    access_token = oauth2.create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Get Current User
 @router.get("/me", response_model=schemas.UserOut)
 def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     return user
 
 # Edit User Credentials
 @router.put("/me", response_model=schemas.UserOut)
-def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_user = db.query(models.User).filter(models.User.id == user.id).first()
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    db_user.username = user_update.username
-    db_user.password = utils.get_password_hash(user_update.password)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(oauth2.get_current_principal, db, token)
+    hashed_password = await hashing.get_password_hash_async(user_update.password)
+    return await run_in_threadpool(oauth2.update_credentials, db, user, user_update.username, hashed_password)
 
 # View Class
 @router.get("/me/classes", response_model=List[schemas.Course])
-def view_classes(token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    classes = db.query(models.Course).join(models.Teach).filter(models.Teach.instructor_id == user.id).all()
-    return classes
+def view_classes(page: Page = Depends(get_page), token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_read_db)):
+    user = oauth2.get_current_principal(db, token)
+    rows = reads.fetch_page(db, page, reads.classes(page, user.id))
+    return serialization.json_response(List[schemas.Course], rows, page.response)
+
+# View Rosters of the classes taught
+@router.get("/me/rosters", response_model=List[schemas.CourseRoster])
+def view_rosters(term: Optional[str] = None, sy: Optional[str] = None, page: Page = Depends(get_page), token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    query = db.query(models.CourseRoster).join(models.Teach, and_(
+        models.Teach.course_id == models.CourseRoster.course_id,
+        models.Teach.term == models.CourseRoster.term,
+        models.Teach.sy == models.CourseRoster.sy,
+    )).filter(models.Teach.instructor_id == user.id)
+    if term is not None:
+        query = query.filter(models.CourseRoster.term == term)
+    if sy is not None:
+        query = query.filter(models.CourseRoster.sy == sy)
+    return page.finish(page.apply(query, models.CourseRoster.course_id, models.CourseRoster.sy, models.CourseRoster.term).all())
+
+# View Teaching Load per term
+@router.get("/me/load", response_model=List[schemas.InstructorLoad])
+def view_load(token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    return db.query(models.InstructorLoad).filter(models.InstructorLoad.instructor_id == user.id).order_by(models.InstructorLoad.sy, models.InstructorLoad.term).all()
 
 # Create Test
 @router.post("/me/tests", response_model=schemas.Test)
 def create_test(test: schemas.TestCreate, term: str, sy: str, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     new_test = models.Test(date=test.date)
     db.add(new_test)
+    db.flush()
+    db.add(models.TestCreate(instructor_id=user.id, test_id=new_test.id, term=term, sy=sy))
     db.commit()
     db.refresh(new_test)
-    create = models.Create(instructor_id=user.id, test_id=new_test.id, term=term, sy=sy)
-    db.add(create)
-    db.commit()
     return new_test
 
+# Create Test with all of its Items in one transaction
+@router.post("/me/tests/bulk", response_model=schemas.TestWithItems)
+def create_test_bulk(test: schemas.TestBulkCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    return create_test_with_items(db, user.id, test)
+
 # Edit Test
 @router.put("/me/tests/{test_id}", response_model=schemas.Test)
-def edit_test(test_id: int, test_update: schemas.TestCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_test = db.query(models.Test).join(models.Create).filter(models.Create.instructor_id == user.id, models.Test.id == test_id).first()
+def edit_test(test_id: int, test_update: schemas.TestCreate, request: Request, response: Response, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    db_test = db.query(models.Test).join(models.TestCreate).filter(models.TestCreate.instructor_id == user.id, models.Test.id == test_id).first()
     if db_test is None:
         raise HTTPException(status_code=404, detail="Test not found")
+    conditional.check_if_match(request, db_test)
     db_test.date = test_update.date
     db.commit()
     db.refresh(db_test)
+    conditional.set_validators(response, db_test)
     return db_test
 
 # Delete Test
 @router.delete("/me/tests/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_test(test_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_test = db.query(models.Test).join(models.Create).filter(models.Create.instructor_id == user.id, models.Test.id == test_id).first()
-    if db_test is None:
-        raise HTTPException(status_code=404, detail="Test not found")
-    
-    test_items = db.query(models.TestItem).join(models.Construct).filter(models.Construct.test_id == test_id).all()
-    for item in test_items:
-        if db.query(models.Construct).filter(models.Construct.test_item_id == item.id, models.Construct.test_id != test_id).count() > 0:
-            raise HTTPException(status_code=400, detail="Cannot delete test as some test items are being used by other instructors")
-    
-    db.query(models.Construct).filter(models.Construct.test_id == test_id).delete()
-    db.query(models.Create).filter(models.Create.test_id == test_id).delete()
-    db.query(models.Test).filter(models.Test.id == test_id).delete()
-    db.commit()
+    user = oauth2.get_current_principal(db, token)
+    delete_tests(db, user.id, [test_id])
     return {"message": "Test deleted"}
 
+# Delete Several Tests in one transaction, ids=1,2,3
+@router.delete("/me/tests", status_code=status.HTTP_204_NO_CONTENT)
+def delete_many_tests(ids: str, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    delete_tests(db, user.id, parse_ids(ids))
+    return {"message": "Tests deleted"}
+
 # Add Test Item
 @router.post("/me/tests/{test_id}/items", response_model=schemas.TestItem)
 def add_test_item(test_id: int, test_item: schemas.TestItemCreate, term: str, sy: str, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     new_test_item = models.TestItem(question=test_item.question, answer=test_item.answer)
     db.add(new_test_item)
     db.commit()
@@ -104,21 +126,26 @@ def add_test_item(test_id: int, test_item: schemas.TestItemCreate, term: str, sy
 
 # Edit Test Item
 @router.put("/me/tests/{test_id}/items/{test_item_id}", response_model=schemas.TestItem)
-def edit_test_item(test_id: int, test_item_id: int, test_item_update: schemas.TestItemCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+def edit_test_item(test_id: int, test_item_id: int, test_item_update: schemas.TestItemCreate, request: Request, response: Response, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
     db_test_item = db.query(models.TestItem).join(models.Construct).filter(models.Construct.instructor_id == user.id, models.TestItem.id == test_item_id).first()
     if db_test_item is None:
         raise HTTPException(status_code=404, detail="Test item not found")
+    conditional.check_if_match(request, db_test_item)
     db_test_item.question = test_item_update.question
     db_test_item.answer = test_item_update.answer
+    db.flush()
+    # The answer key may have changed
+    results.rebuild_test_scores(db, results.tests_containing_statement([test_item_id]))
     db.commit()
     db.refresh(db_test_item)
+    conditional.set_validators(response, db_test_item)
     return db_test_item
 
 # Delete Test Item
 @router.delete("/me/tests/{test_id}/items/{test_item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_test_item(test_id: int, test_item_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     db_test_item = db.query(models.TestItem).join(models.Construct).filter(models.Construct.instructor_id == user.id, models.TestItem.id == test_item_id).first()
     if db_test_item is None:
         raise HTTPException(status_code=404, detail="Test item not found")
@@ -128,13 +155,14 @@ def delete_test_item(test_id: int, test_item_id: int, token: str = Depends(oauth
 
     db.query(models.Construct).filter(models.Construct.test_item_id == test_item_id).delete()
     db.query(models.TestItem).filter(models.TestItem.id == test_item_id).delete()
+    results.rebuild_test_scores(db, [test_id])
     db.commit()
     return {"message": "Test item deleted"}
 
 # Publish Test Item
 @router.post("/me/tests/{test_id}/items/{test_item_id}/publish")
 def publish_test_item(test_id: int, test_item_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     db_test_item = db.query(models.TestItem).join(models.Construct).filter(models.Construct.instructor_id == user.id, models.TestItem.id == test_item_id).first()
     if db_test_item is None:
         raise HTTPException(status_code=404, detail="Test item not found")
@@ -146,12 +174,33 @@ def publish_test_item(test_id: int, test_item_id: int, token: str = Depends(oaut
 
 # Generate Test Result
 @router.get("/me/tests/{test_id}/results")
-def generate_test_result(test_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_test = db.query(models.Test).join(models.Create).filter(models.Create.instructor_id == user.id, models.Test.id == test_id).first()
+def generate_test_result(test_id: int, page: Page = Depends(get_page), token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    db_test = db.query(models.Test).join(models.TestCreate).filter(models.TestCreate.instructor_id == user.id, models.Test.id == test_id).first()
     if db_test is None:
         raise HTTPException(status_code=404, detail="Test not found")
 
     # Example logic for generating test results
-    results = db.query(models.Take).filter(models.Take.test_id == test_id).all()
-    return {"test_id": test_id, "results": results}
+    query = db.query(models.TestTake).filter(models.TestTake.test_id == test_id)
+    results = page.finish(page.apply(query, models.TestTake.student_id).all())
+    return {"test_id": test_id, "results": [schemas.Take.model_validate(take) for take in results]}
+
+# Gradebook: per-student scores, item difficulty/discrimination and score distribution
+@router.get("/me/tests/{test_id}/gradebook", response_model=schemas.Gradebook)
+def view_gradebook(test_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    db_test = db.query(models.Test).join(models.TestCreate).filter(models.TestCreate.instructor_id == user.id, models.Test.id == test_id).first()
+    if db_test is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    return results.get_gradebook(db, test_id)
+
+# Recompute the gradebook of a test from its answers
+@router.post("/me/tests/{test_id}/gradebook/refresh", response_model=schemas.Gradebook)
+def refresh_gradebook(test_id: int, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = oauth2.get_current_principal(db, token)
+    db_test = db.query(models.Test).join(models.TestCreate).filter(models.TestCreate.instructor_id == user.id, models.Test.id == test_id).first()
+    if db_test is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    results.rebuild_test_scores(db, [test_id])
+    db.commit()
+    return results.get_gradebook(db, test_id)
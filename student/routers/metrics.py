@@ -0,0 +1,52 @@
+from fastapi import APIRouter
+from .. import database, oauth2, hashing, answer_buffer, replicas, response_cache, lifecycle, query_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=['Metrics']
+)
+
+# Connection pool usage and checkout wait times
+@router.get("/db-pool")
+def db_pool_metrics():
+    return database.get_pool_stats()
+
+# Hit/miss/eviction counters of the get_current_user cache
+@router.get("/user-cache")
+def user_cache_metrics():
+    return oauth2.user_cache.stats()
+
+# bcrypt executor queue depth and latency
+@router.get("/hashing")
+def hashing_metrics():
+    return hashing.get_stats()
+
+# Successful-login cache used by authenticate_user
+@router.get("/login-cache")
+def login_cache_metrics():
+    return oauth2.login_cache.stats()
+
+# Write-behind answer buffer depth, flush latency and batch sizes
+@router.get("/answer-buffer")
+def answer_buffer_metrics():
+    return answer_buffer.get_stats()
+
+# Read replica health and how reads were routed
+@router.get("/replicas")
+def replica_metrics():
+    return replicas.get_stats()
+
+# Catalog response cache hits, misses and 304s
+@router.get("/response-cache")
+def response_cache_metrics():
+    return response_cache.get_stats()
+
+# Startup duration by phase (migration check, pool warm-up)
+@router.get("/startup")
+def startup_metrics():
+    return lifecycle.get_stats()
+
+# Queries and DB time per request, slow query count
+@router.get("/sql")
+def sql_metrics():
+    return query_stats.get_stats()
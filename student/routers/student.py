@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import List
-from .. import models, schemas, oauth2, utils
+from .. import models, schemas, oauth2, hashing, answer_buffer, results, serialization
 from ..database import get_db
+from ..replicas import get_read_db
+from ..loaders import load_student_enrollments
+from ..pagination import parse_ids
+from ..bulk import upsert_statement
 
 router = APIRouter(
     prefix="/students",
@@ -12,54 +18,87 @@ router = APIRouter(
 
 # User Login
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = oauth2.authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await oauth2.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = oauth2.create_access_token(data={"sub": user.username})
+    access_token = oauth2.create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Get Current User
 @router.get("/me", response_model=schemas.UserOut)
 def read_users_me(token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
+    user = oauth2.get_current_principal(db, token)
     return user
 
 # Edit User Credentials
 @router.put("/me", response_model=schemas.UserOut)
-def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
-    user = oauth2.get_current_user(db, token)
-    db_user = db.query(models.User).filter(models.User.id == user.id).first()
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    db_user.username = user_update.username
-    db_user.password = utils.get_password_hash(user_update.password)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+async def update_user(user_update: schemas.UserCreate, token: str = Depends(oauth2.oauth2_scheme), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(oauth2.get_current_principal, db, token)
+    hashed_password = await hashing.get_password_hash_async(user_update.password)
+    return await run_in_threadpool(oauth2.update_credentials, db, user, user_update.username, hashed_password)
 
 # Take Assessment
 @router.post("/{student_id}/assessments/{test_id}/take")
 def take_assessment(student_id: int, test_id: int, term: str, sy: str, db: Session = Depends(get_db)):
-    take = models.Take(student_id=student_id, test_id=test_id, term=term, sy=sy)
+    take = models.TestTake(student_id=student_id, test_id=test_id, term=term, sy=sy)
     db.add(take)
     db.commit()
     return {"message": "Assessment started"}
 
 # Answer Test Item
 @router.post("/{student_id}/test_items/{test_item_id}/answer")
-def answer_test_item(student_id: int, test_item_id: int, term: str, sy: str, answer: str, db: Session = Depends(get_db)):
-    answer_record = models.Answer(student_id=student_id, test_item_id=test_item_id, term=term, sy=sy, answer=answer)
+def answer_test_item(student_id: int, test_item_id: int, term: str, sy: str, answer: str, response: Response, db: Session = Depends(get_db)):
+    if answer_buffer.enabled():
+        answer_buffer.submit(student_id, test_item_id, term, sy, answer)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Answer accepted"}
+    answer_record = models.TestAnswer(student_id=student_id, test_item_id=test_item_id, term=term, sy=sy, answer=answer)
     db.add(answer_record)
+    db.flush()
+    results.refresh_student_scores(db, [student_id], [test_item_id])
     db.commit()
     return {"message": "Answer recorded"}
 
+# Submit Answer Sheet (every answer of a test in one request)
+@router.post("/{student_id}/assessments/{test_id}/answers", response_model=schemas.AnswerSheetResult)
+def submit_answer_sheet(student_id: int, test_id: int, sheet: schemas.AnswerSheet, db: Session = Depends(get_db)):
+    # The last answer given for an item wins
+    answers = {item.test_item_id: item.answer for item in sheet.answers}
+    in_test = set(db.scalars(
+        select(models.Construct.test_item_id).filter(models.Construct.test_id == test_id, models.Construct.test_item_id.in_(answers))
+    ))
+    rows = [
+        {"student_id": student_id, "test_item_id": test_item_id, "term": sheet.term, "sy": sheet.sy, "answer": answer}
+        for test_item_id, answer in answers.items() if test_item_id in in_test
+    ]
+    if rows:
+        db.execute(upsert_statement(db, models.TestAnswer, ["student_id", "test_item_id"], ["term", "sy", "answer"]), rows)
+        results.refresh_student_scores(db, [student_id], [row["test_item_id"] for row in rows])
+        db.commit()
+
+    statuses, seen = [], set()
+    for item in reversed(sheet.answers):
+        if item.test_item_id in seen:
+            status_ = "superseded"
+        else:
+            status_ = "saved" if item.test_item_id in in_test else "not_in_test"
+            seen.add(item.test_item_id)
+        statuses.append({"test_item_id": item.test_item_id, "status": status_})
+    statuses.reverse()
+    return {"test_id": test_id, "saved": len(rows), "results": statuses}
+
 # Display Enrolled Courses and Academic Program
 @router.get("/{student_id}/enrollments", response_model=schemas.StudentEnrollment)
-def get_student_enrollments(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
-    if not student:
+def get_student_enrollments(student_id: int, db: Session = Depends(get_read_db)):
+    enrollment = load_student_enrollments(db, [student_id]).get(student_id)
+    if not enrollment:
         raise HTTPException(status_code=404, detail="Student not found")
-    enrollments = db.query(models.Enroll).filter(models.Enroll.student_id == student_id).all()
-    acad_program = db.query(models.AcadProgram).filter(models.AcadProgram.id == student.acad_program_id).first()
-    return {"student": student, "enrollments": enrollments, "acad_program": acad_program}
+    return enrollment
+
+# Display Enrollments of Several Students (e.g. a section roster), ids=1,2,3
+@router.get("/enrollments", response_model=List[schemas.StudentEnrollment])
+def get_students_enrollments(ids: str, db: Session = Depends(get_db)):
+    student_ids = parse_ids(ids)
+    enrollments = load_student_enrollments(db, student_ids)
+    return serialization.json_response(List[schemas.StudentEnrollment], [enrollments[student_id] for student_id in student_ids if student_id in enrollments])
@@ -9,6 +9,16 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     id: Optional[str] = None
 
+# Identity carried by a stateless access token
+class Principal(BaseModel):
+    id: int
+    username: str
+    role: Optional[str] = None
+    token_version: int = 0
+
+    class Config:
+        frozen = True
+
 class UserBase(BaseModel):
     username: str
 
@@ -46,6 +56,9 @@ class Student(StudentBase):
     class Config:
         from_attributes = True
 
+class StudentImport(StudentBase):
+    acad_program_id: int
+
 class CourseBase(BaseModel):
     code: str
     title: str
@@ -108,6 +121,17 @@ class TestItem(TestItemBase):
     class Config:
         from_attributes = True
 
+class TestItemAuthor(TestItemCreate):
+    lesson_ids: List[int] = []
+
+class TestBulkCreate(TestCreate):
+    term: str
+    sy: str
+    items: List[TestItemAuthor]
+
+class TestWithItems(Test):
+    items: List[TestItem]
+
 class Assessment(BaseModel):
     test: Test
     items: List[TestItem]
@@ -195,6 +219,24 @@ class Answer(AnswerBase):
     class Config:
         from_attributes = True
 
+class AnswerSheetItem(BaseModel):
+    test_item_id: int
+    answer: str
+
+class AnswerSheet(BaseModel):
+    term: str
+    sy: str
+    answers: List[AnswerSheetItem]
+
+class AnswerSheetItemStatus(BaseModel):
+    test_item_id: int
+    status: str
+
+class AnswerSheetResult(BaseModel):
+    test_id: int
+    saved: int
+    results: List[AnswerSheetItemStatus]
+
 class HaveBase(BaseModel):
     course_id: int
     lesson_id: int
@@ -225,9 +267,78 @@ class Make(MakeBase):
     class Config:
         from_attributes = True
 
+class EnrolledCourse(CourseBase):
+    id: int
+    term: str
+    sy: str
+
+    class Config:
+        from_attributes = True
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportJob(BaseModel):
+    id: str
+    target: str
+    status: str
+    rows_processed: int
+    rows_loaded: int
+    rows_failed: int
+    progress: float
+    errors: List[ImportRowError]
+    detail: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class StudentScore(BaseModel):
+    student_id: int
+    correct: int
+    answered: int
+    score: float
+
+class ItemStat(BaseModel):
+    test_item_id: int
+    responses: int
+    correct: int
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+
+class ScoreBucket(BaseModel):
+    correct: int
+    students: int
+
+class Gradebook(BaseModel):
+    test_id: int
+    items_count: int
+    students: List[StudentScore]
+    items: List[ItemStat]
+    distribution: List[ScoreBucket]
+
+class CourseRoster(BaseModel):
+    course_id: int
+    term: str
+    sy: str
+    students: int
+
+    class Config:
+        from_attributes = True
+
+class InstructorLoad(BaseModel):
+    instructor_id: int
+    term: str
+    sy: str
+    courses: int
+    students: int
+
+    class Config:
+        from_attributes = True
+
 class StudentEnrollment(BaseModel):
     student: Student
-    enrollments: List[Course]
+    enrollments: List[EnrolledCourse]
     acad_program: AcadProgram
 
     class Config:
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Row
+
+# Fast path for hot list endpoints: Core rows (or plain values) are validated by a
+# cached TypeAdapter of the response type and dumped straight to JSON bytes in
+# pydantic-core, skipping FastAPI's response_model round trip through
+# jsonable_encoder and the JSON encoder.
+
+@lru_cache(maxsize=None)
+def adapter(response_type):
+    return TypeAdapter(response_type)
+
+# Rows become dicts keyed by their column labels: pydantic reads dict keys much
+# faster than Row attributes (from_attributes) or the RowMapping view
+def _plain(data):
+    if isinstance(data, Row):
+        return dict(zip(data._fields, data))
+    if isinstance(data, list) and data and isinstance(data[0], Row):
+        fields = data[0]._fields
+        return [dict(zip(fields, row)) for row in data]
+    return data
+
+def to_json(type_adapter, data):
+    return type_adapter.dump_json(type_adapter.validate_python(_plain(data), from_attributes=True))
+
+def dump_json(response_type, data):
+    return to_json(adapter(response_type), data)
+
+# Pagination headers set on the endpoint's Response by Page.finish
+PAGINATION_HEADERS = ("link", "x-next-cursor")
+
+def json_response(response_type, data, response: Response = None):
+    headers = None
+    if response is not None:
+        headers = {name: response.headers[name] for name in PAGINATION_HEADERS if name in response.headers}
+    return Response(content=dump_json(response_type, data), media_type="application/json", headers=headers)
@@ -1,7 +1,8 @@
 from passlib.context import CryptContext
+from .config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing, hashes below BCRYPT_ROUNDS are upgraded on the next successful login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # Utility functions for password hashing and verification
 def verify_password(plain_password, hashed_password):
@@ -9,3 +10,7 @@ def verify_password(plain_password, hashed_password):
 
 def get_password_hash(password):
     return pwd_context.hash(password)
+
+# Verify and return a replacement hash when the stored one uses outdated settings (or None)
+def verify_and_update(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite file first
+_db_path = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_db_path}",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "DB_CREATE_ALL": "true",
+    "RESPONSE_CACHE_BACKEND": "none",
+    "AUTH_STATELESS": "true",
+    "BCRYPT_ROUNDS": "4",
+})
+
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from student import database, models
+from student.main import app
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+# Fresh tables for every test
+@pytest.fixture
+def db(client):
+    database.Base.metadata.drop_all(bind=database.engine)
+    database.Base.metadata.create_all(bind=database.engine)
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+# N tests of `items` items each, created by one instructor; returns the test ids
+@pytest.fixture
+def seed_tests(db):
+    def seed(n, items=3):
+        instructor = models.Instructor(name="Instructor")
+        db.add(instructor)
+        db.flush()
+        test_ids = []
+        for _ in range(n):
+            test = models.Test(date=datetime.date(2024, 1, 15))
+            db.add(test)
+            db.flush()
+            db.add(models.TestCreate(instructor_id=instructor.id, test_id=test.id, term="1", sy="2024"))
+            for i in range(items):
+                item = models.TestItem(question=f"Q{test.id}.{i}", answer="a")
+                db.add(item)
+                db.flush()
+                db.add(models.Construct(instructor_id=instructor.id, test_item_id=item.id, test_id=test.id, term="1", sy="2024"))
+            test_ids.append(test.id)
+        db.commit()
+        return test_ids
+    return seed
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import exc
+from student import answer_buffer
+
+def _row(student_id, test_item_id, answer="a"):
+    return {"student_id": student_id, "test_item_id": test_item_id, "term": "1", "sy": "2024", "answer": answer}
+
+@pytest.fixture
+def buffer(monkeypatch):
+    monkeypatch.setattr(answer_buffer, "_rows", {})
+    return answer_buffer
+
+def test_unreachable_database_requeues_rows(buffer, monkeypatch):
+    def unreachable(rows):
+        raise exc.OperationalError("INSERT", {}, Exception("connection refused"))
+    monkeypatch.setattr(buffer, "_write", unreachable)
+    buffer._rows[(1, 2)] = _row(1, 2, "newer")
+
+    assert buffer._flush([_row(1, 1), _row(1, 2)]) is False
+    # Failed rows go back ahead of newer ones, a newer answer for the same item wins
+    assert list(buffer._rows) == [(1, 1), (1, 2)]
+    assert buffer._rows[(1, 2)]["answer"] == "newer"
+
+def test_requeue_respects_capacity(buffer, monkeypatch):
+    monkeypatch.setattr(buffer.settings, "ANSWER_BUFFER_MAX_ROWS", 2)
+    buffer._rows[(9, 9)] = _row(9, 9)
+    buffer._requeue([_row(1, 1), _row(1, 2)])
+    assert list(buffer._rows) == [(1, 1), (9, 9)]
+
+def test_only_rejected_rows_are_dropped(buffer, monkeypatch):
+    written = []
+    def write(rows):
+        if len(rows) > 1:
+            raise exc.IntegrityError("INSERT", {}, Exception("constraint"))
+        if rows[0]["student_id"] == 404:
+            raise exc.IntegrityError("INSERT", {}, Exception("foreign key"))
+        written.extend(rows)
+    monkeypatch.setattr(buffer, "_write", write)
+    dropped = buffer.buffer_counters.snapshot()["dropped"]
+
+    assert buffer._flush([_row(1, 1), _row(404, 1), _row(1, 2)]) is True
+    assert [(row["student_id"], row["test_item_id"]) for row in written] == [(1, 1), (1, 2)]
+    assert buffer.buffer_counters.snapshot()["dropped"] == dropped + 1
+    assert buffer._rows == {}
@@ -0,0 +1,27 @@
+from student import models
+
+def test_submit_answer_sheet_saves_answers_and_scores(client, db, seed_tests):
+    test_id = seed_tests(1, items=2)[0]
+    item_ids = [construct.test_item_id for construct in db.query(models.Construct).filter(models.Construct.test_id == test_id)]
+    program = models.AcadProgram(acad_name="BSCS")
+    db.add(program)
+    db.flush()
+    student = models.Student(student_id="2024-0001", acad_program_id=program.id)
+    db.add(student)
+    db.commit()
+
+    sheet = {"term": "1", "sy": "2024", "answers": [
+        {"test_item_id": item_ids[0], "answer": "b"},
+        {"test_item_id": item_ids[1], "answer": "a"},
+        {"test_item_id": item_ids[0], "answer": "a"},
+        {"test_item_id": 999, "answer": "a"},
+    ]}
+    response = client.post(f"/students/{student.id}/assessments/{test_id}/answers", json=sheet)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["saved"] == 2
+    assert [result["status"] for result in body["results"]] == ["superseded", "saved", "saved", "not_in_test"]
+    db.expire_all()
+    score = db.get(models.TestScore, (test_id, student.id))
+    assert (score.correct, score.answered) == (2, 2)
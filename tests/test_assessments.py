@@ -0,0 +1,16 @@
+import pytest
+from student import query_stats
+
+# One query for the page of tests, one for the items of all of them
+ASSESSMENT_QUERIES = 2
+
+@pytest.mark.parametrize("n", [1, 5, 25])
+def test_view_assessments_query_count_is_constant(client, seed_tests, n):
+    test_ids = seed_tests(n, items=3)
+    with query_stats.max_queries(ASSESSMENT_QUERIES) as stats:
+        response = client.get("/admins/assessments", params={"limit": 50})
+    assert response.status_code == 200, response.text
+    assert stats.count == ASSESSMENT_QUERIES
+    assessments = response.json()
+    assert [assessment["test"]["id"] for assessment in assessments] == test_ids
+    assert all(len(assessment["items"]) == 3 for assessment in assessments)
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import HTTPException
+from student import oauth2, schemas
+
+# In-memory stand-in for the Redis-protocol backend shared by the workers
+class _SharedStore:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+class _User:
+    id = 7
+    username = "ana"
+    role = "student"
+    token_version = 0
+
+@pytest.fixture
+def shared(monkeypatch):
+    store = _SharedStore()
+    monkeypatch.setattr(oauth2, "_shared_revocations", store)
+    monkeypatch.setattr(oauth2, "_shared_users", store)
+    monkeypatch.setattr(oauth2, "_revocations", {})
+    yield store
+    oauth2.user_cache.invalidate("ana")
+
+# Another worker: none of the revoking worker's process state
+def _other_worker(monkeypatch):
+    monkeypatch.setattr(oauth2, "_revocations", {})
+    oauth2.user_cache.invalidate("ana")
+
+def test_revocation_reaches_other_workers(shared, monkeypatch):
+    token = oauth2.create_user_token(_User())
+    assert oauth2.get_token_principal(token).id == 7
+
+    oauth2.revoke_user_tokens(7, min_version=1)
+    _other_worker(monkeypatch)
+    with pytest.raises(HTTPException):
+        oauth2.get_token_principal(token)
+
+def test_user_invalidation_reaches_other_workers(shared, monkeypatch):
+    oauth2._cache_user("ana", oauth2.snapshot_user(_User()))
+    _other_worker(monkeypatch)
+    assert oauth2._cached_user("ana") == schemas.Principal(id=7, username="ana", role="student", token_version=0)
+
+    oauth2.invalidate_user("ana")
+    assert oauth2._cached_user("ana") is None
+
+def test_shared_store_outage_falls_back_to_process_state(shared, monkeypatch):
+    def down(*args):
+        raise ConnectionError("down")
+    monkeypatch.setattr(shared, "get", down)
+    monkeypatch.setattr(shared, "set", down)
+    token = oauth2.create_user_token(_User())
+
+    oauth2.revoke_user_tokens(7, min_version=1)
+    with pytest.raises(HTTPException):
+        oauth2.get_token_principal(token)
@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import create_async_engine
+from student import database
+
+def test_async_url_mapping():
+    assert database.to_async_url("postgres://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert database.to_async_url("postgresql://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert database.to_async_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+# The SQLite driver is installed with requirements.txt (psycopg needs a server to connect)
+def test_sqlite_async_driver_loads():
+    engine = create_async_engine(database.to_async_url("sqlite://"))
+    assert engine.dialect.driver == "aiosqlite"
@@ -0,0 +1,24 @@
+import pytest
+from student import models, oauth2
+
+ROUTES = ["/exports/enrollments", "/exports/test_takes", "/exports/test_answers", "/exports/instructors"]
+
+def _headers(role):
+    token = oauth2.create_access_token({"sub": role, "uid": 1, "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_exports_require_a_token(client, db, route):
+    assert client.get(route).status_code == 401
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_exports_reject_students(client, db, route):
+    assert client.get(route, headers=_headers("student")).status_code == 403
+
+def test_exports_for_admins_and_instructors(client, db):
+    db.add(models.Instructor(name="Instructor"))
+    db.commit()
+    for role in ("admin", "instructor"):
+        response = client.get("/exports/instructors", headers=_headers(role))
+        assert response.status_code == 200
+        assert '"name":"Instructor"' in response.text.replace(" ", "")
@@ -0,0 +1,24 @@
+import asyncio
+import pytest
+from student import hashing, oauth2
+from student.main import app
+
+# bcrypt must never run on a request threadpool thread: these handlers await the executor
+CREDENTIAL_ROUTES = [
+    ("POST", "/login"), ("POST", "/register"),
+    ("POST", "/admins/token"), ("PUT", "/admins/me"), ("POST", "/admins/instructors/credentials"),
+    ("POST", "/instructors/token"), ("PUT", "/instructors/me"),
+    ("POST", "/students/token"), ("PUT", "/students/me"),
+]
+
+@pytest.mark.parametrize("method,path", CREDENTIAL_ROUTES)
+def test_credential_handlers_are_async(method, path):
+    endpoints = [route.endpoint for route in app.routes if getattr(route, "path", None) == path and method in route.methods]
+    assert endpoints and all(asyncio.iscoroutinefunction(endpoint) for endpoint in endpoints)
+
+def test_full_hashing_queue_answers_429(client, monkeypatch):
+    monkeypatch.setattr(hashing.settings, "HASH_QUEUE_LIMIT", 0)
+    token = oauth2.create_access_token({"sub": "student", "uid": 1, "role": "student"})
+    response = client.put("/students/me", json={"username": "student", "password": "secret"}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
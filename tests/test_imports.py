@@ -0,0 +1,72 @@
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from student import database, importer, models, schemas
+
+def _upload(client, body, name="students.csv"):
+    return client.post("/admins/imports/students", files={"file": (name, body.encode(), "text/csv")})
+
+def test_import_status_is_read_from_the_database(client, db):
+    program = models.AcadProgram(acad_name="BSCS")
+    db.add(program)
+    db.commit()
+
+    response = _upload(client, f"student_id,acad_program_id\n2024-1,{program.id}\n2024-2,{program.id}\n2024-3,999999\n")
+    assert response.status_code == 202, response.text
+    job_id = response.json()["id"]
+
+    # Any worker answers the poll: the status lives in import_job, not in process memory
+    db.expire_all()
+    record = db.get(models.ImportJob, job_id)
+    assert record.status == "done"
+    status = client.get(f"/admins/imports/{job_id}").json()
+    assert (status["rows_processed"], status["progress"]) == (3, 1.0)
+    # The unknown program is rejected by the foreign key, the other rows still load
+    assert (status["rows_loaded"], status["rows_failed"]) == (2, 1)
+    assert [error["row"] for error in status["errors"]] == [3]
+    assert "FOREIGN KEY" in status["errors"][0]["error"]
+    assert {student.student_id for student in db.query(models.Student)} == {"2024-1", "2024-2"}
+    assert client.get("/admins/imports/unknown").status_code == 404
+
+def test_only_recent_jobs_are_kept(client, db, monkeypatch):
+    monkeypatch.setattr(importer.settings, "IMPORT_JOBS_KEEP", 2)
+    job_ids = [_upload(client, "student_id,acad_program_id\n").json()["id"] for _ in range(3)]
+    assert {job.id for job in db.query(models.ImportJob)} == set(job_ids[1:])
+
+def _compile(statement):
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+# PostgreSQL path: staging table and COPY, then one INSERT ... SELECT
+def test_copy_path_sql_upserts_on_the_primary_key():
+    create_sql, copy_sql = importer._stage_sql(models.Enroll, ["student_id", "course_id", "term", "sy"])
+    assert create_sql == "CREATE TEMP TABLE import_stage ON COMMIT DROP AS SELECT student_id, course_id, term, sy FROM enroll WITH NO DATA"
+    assert copy_sql == "COPY import_stage (student_id, course_id, term, sy) FROM STDIN WITH (FORMAT csv)"
+    assert _compile(importer._merge_statement(models.Enroll, ["student_id", "course_id", "term", "sy"])) == (
+        "INSERT INTO enroll (student_id, course_id, term, sy) "
+        "SELECT import_stage.student_id, import_stage.course_id, import_stage.term, import_stage.sy FROM import_stage "
+        "ON CONFLICT (student_id, course_id) DO UPDATE SET term = excluded.term, sy = excluded.sy"
+    )
+
+def test_copy_path_sql_inserts_surrogate_key_rows():
+    sql = _compile(importer._merge_statement(models.Student, ["student_id", "acad_program_id"]))
+    assert sql.startswith("INSERT INTO student (student_id, acad_program_id")
+    assert "FROM import_stage" in sql and "ON CONFLICT" not in sql
+
+# Runs the COPY path against a real server: TEST_POSTGRES_URL=postgresql://... (scratch database)
+@pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+def test_copy_path_on_postgresql(monkeypatch):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    database.Base.metadata.drop_all(engine)
+    database.Base.metadata.create_all(engine)
+    monkeypatch.setattr(importer, "engine", engine)
+    try:
+        with engine.begin() as conn:
+            program_id = conn.execute(models.AcadProgram.__table__.insert().returning(models.AcadProgram.id), {"acad_name": "BSCS"}).scalar()
+        columns = list(schemas.StudentImport.model_fields)
+        importer._load_chunk_copy(models.Student, columns, [{"student_id": f"2024-{i}", "acad_program_id": program_id} for i in range(3)])
+        with engine.connect() as conn:
+            assert len(conn.execute(models.Student.__table__.select()).all()) == 3
+    finally:
+        database.Base.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,36 @@
+from student import models, oauth2
+
+def _headers(instructor_id):
+    token = oauth2.create_access_token({"sub": "instructor", "uid": instructor_id, "role": "instructor"})
+    return {"Authorization": f"Bearer {token}"}
+
+def test_create_test(client, db):
+    instructor = models.Instructor(name="Instructor")
+    db.add(instructor)
+    db.commit()
+
+    response = client.post("/instructors/me/tests", params={"term": "1", "sy": "2024"}, json={"date": "2024-01-15"}, headers=_headers(instructor.id))
+    assert response.status_code == 200
+    test_id = response.json()["id"]
+    assert db.query(models.TestCreate).filter(models.TestCreate.test_id == test_id).one().instructor_id == instructor.id
+
+def test_generate_test_result(client, db, seed_tests):
+    test_id = seed_tests(1)[0]
+    instructor_id = db.query(models.TestCreate.instructor_id).filter(models.TestCreate.test_id == test_id).scalar()
+    program = models.AcadProgram(acad_name="BSCS")
+    db.add(program)
+    db.flush()
+    students = [models.Student(student_id=f"S{i}", acad_program_id=program.id) for i in range(3)]
+    db.add_all(students)
+    db.flush()
+    db.add_all([models.TestTake(student_id=student.id, test_id=test_id, term="1", sy="2024") for student in students])
+    db.commit()
+
+    response = client.get(f"/instructors/me/tests/{test_id}/results", params={"limit": 2}, headers=_headers(instructor_id))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["test_id"] == test_id
+    assert [take["student_id"] for take in body["results"]] == [students[0].id, students[1].id]
+
+    # Another instructor's test
+    assert client.get(f"/instructors/me/tests/{test_id}/results", headers=_headers(instructor_id + 1)).status_code == 404
@@ -0,0 +1,47 @@
+import os
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from student import database, lifecycle
+
+HEAD = "4c2a8f61d0e7"
+
+def _stamp(revision):
+    with database.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        conn.execute(text("DELETE FROM alembic_version"))
+        conn.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+# One head, so `alembic upgrade head` and the strict startup check are unambiguous
+def test_single_alembic_head():
+    assert lifecycle.expected_heads() == {HEAD}
+
+# The retired branch that drops and renames every table is not on any upgrade path
+def test_upgrade_path_skips_the_retired_branch():
+    script = ScriptDirectory(lifecycle.ALEMBIC_DIR)
+    path = [revision.revision for revision in script.iterate_revisions("head", "base")]
+    assert path[0] == HEAD and path[-1] == "168e3bb0c34c"
+    assert not lifecycle.RETIRED_REVISIONS & set(path)
+    assert list(script.iterate_revisions("head", HEAD)) == []
+
+# script_location resolves against alembic.ini, not the working directory
+def test_alembic_ini_works_from_any_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = Config(os.path.join(lifecycle.PROJECT_DIR, "alembic.ini"))
+    assert ScriptDirectory.from_config(config).get_heads() == [HEAD]
+
+def test_database_at_head_passes(db):
+    _stamp(HEAD)
+    lifecycle.check_migrations()
+
+def test_mismatch_names_the_upgrade_command(db):
+    _stamp("9e1f5c3b7a20")
+    with pytest.raises(lifecycle.MigrationMismatch) as error:
+        lifecycle.check_migrations()
+    assert f"run `cd {lifecycle.PROJECT_DIR} && alembic upgrade head`" in str(error.value)
+
+def test_retired_revision_is_not_upgraded(db):
+    _stamp("n312ae45d3075")
+    with pytest.raises(lifecycle.MigrationMismatch, match="retired revision"):
+        lifecycle.check_migrations()
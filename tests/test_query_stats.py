@@ -0,0 +1,59 @@
+import threading
+import pytest
+from sqlalchemy import text
+from student import database, models, oauth2, query_stats
+
+# Ownership check, shared-items check, then one DELETE per table, however many tests and items
+DELETE_TEST_QUERIES = 6
+
+def _instructor_headers(db, test_id):
+    instructor_id = db.query(models.TestCreate.instructor_id).filter(models.TestCreate.test_id == test_id).scalar()
+    token = oauth2.create_access_token({"sub": "instructor", "uid": instructor_id, "role": "instructor"})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.mark.parametrize("items", [1, 20])
+def test_delete_test_query_count(client, db, seed_tests, items):
+    test_id = seed_tests(1, items=items)[0]
+    headers = _instructor_headers(db, test_id)
+    with query_stats.max_queries(DELETE_TEST_QUERIES):
+        response = client.delete(f"/instructors/me/tests/{test_id}", headers=headers)
+    assert response.status_code == 204, response.text
+    db.expire_all()
+    assert db.get(models.Test, test_id) is None
+    assert db.query(models.Construct).count() == 0
+
+def test_delete_many_tests_query_count(client, db, seed_tests):
+    test_ids = seed_tests(10, items=5)
+    headers = _instructor_headers(db, test_ids[0])
+    with query_stats.max_queries(DELETE_TEST_QUERIES):
+        response = client.delete("/instructors/me/tests", params={"ids": ",".join(map(str, test_ids))}, headers=headers)
+    assert response.status_code == 204, response.text
+
+def test_view_assessments_within_budget(client, seed_tests):
+    seed_tests(10)
+    with query_stats.max_queries(2):
+        assert client.get("/admins/assessments").status_code == 200
+
+def test_max_queries_fails_listing_statements(db):
+    with pytest.raises(AssertionError) as failure:
+        with query_stats.max_queries(1):
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+    assert "2 queries executed, at most 1 expected" in str(failure.value)
+    assert "SELECT 2" in str(failure.value)
+
+# The request runs in TestClient's event loop thread and the threadpool, not the test's
+def test_max_queries_counts_other_threads(db):
+    def query():
+        with database.SessionLocal() as session:
+            session.execute(text("SELECT 1"))
+    with query_stats.max_queries(1) as stats:
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+    assert stats.count == 1
+
+def test_server_timing_header(client, seed_tests):
+    seed_tests(2)
+    timing = client.get("/admins/assessments").headers["server-timing"]
+    assert timing.startswith("db;dur=") and 'desc="2 queries"' in timing
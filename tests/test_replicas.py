@@ -0,0 +1,33 @@
+import time
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+from student import replicas
+
+def _request(headers=()):
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(k.lower().encode(), v.encode()) for k, v in headers]})
+
+class _Replica:
+    healthy = True
+
+@pytest.fixture
+def replica(monkeypatch):
+    replica = _Replica()
+    monkeypatch.setattr(replicas, "replicas", [replica])
+    return replica
+
+def test_write_marker_travels_with_the_client(replica):
+    response = Response()
+    replicas.note_write(response)
+    cookie = response.headers["set-cookie"].split(";")[0]
+    assert cookie.startswith(f"{replicas.WRITE_COOKIE}=")
+
+    # Browser: the cookie comes back; API client: the echoed header
+    assert replicas._choose(_request([("Cookie", cookie)])) is None
+    assert replicas._choose(_request([(replicas.WRITE_HEADER, response.headers[replicas.WRITE_HEADER])])) is None
+
+def test_other_and_stale_clients_read_replicas(replica):
+    assert replicas._choose(_request()) is replica
+    stale = f"{time.time() - replicas.settings.READ_YOUR_WRITES_SECONDS - 1:.3f}"
+    assert replicas._choose(_request([(replicas.WRITE_HEADER, stale)])) is replica
+    assert replicas._choose(_request([(replicas.WRITE_HEADER, "garbage")])) is replica
@@ -0,0 +1,69 @@
+import pytest
+from student import database, models, replicas, response_cache
+from student.main import app
+
+CACHED_PATHS = [
+    "/admins/classes/{class_id}", "/admins/courses/{course_id}", "/admins/instructors/{instructor_id}",
+    "/admins/acad_programs/{acad_program_id}", "/admins/faculty", "/admins/degree_programs",
+]
+
+def _dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from _dependencies(dependency)
+
+@pytest.mark.parametrize("path", CACHED_PATHS)
+def test_cached_endpoints_use_the_cache_read_session(path):
+    routes = [route for route in app.routes if getattr(route, "path", None) == path and "GET" in route.methods]
+    assert routes
+    for route in routes:
+        calls = set(_dependencies(route.dependant))
+        assert calls & {replicas.get_cache_read_db, replicas.get_async_cache_read_db}
+        assert replicas.get_read_db not in calls and replicas.get_async_read_db not in calls
+
+# Stands in for a replica, on the primary's engine
+class _Replica:
+    healthy = True
+    engine = database.engine
+
+def _reads(client, course_id):
+    before = replicas.counters.snapshot()
+    assert client.get(f"/admins/courses/{course_id}").status_code == 200
+    after = replicas.counters.snapshot()
+    return {name: after.get(name, 0) - before.get(name, 0) for name in ("primary_reads", "replica_reads")}
+
+# A replica read could refill an entry with data older than the write that invalidated it
+def test_cache_fills_read_the_primary_and_uncached_reads_a_replica(client, db, monkeypatch):
+    monkeypatch.setattr(replicas, "replicas", [_Replica()])
+    course = models.Course(code="CS1", title="Intro")
+    db.add(course)
+    db.commit()
+
+    monkeypatch.setattr(response_cache, "backend", None)
+    assert _reads(client, course.id) == {"primary_reads": 0, "replica_reads": 1}
+
+    monkeypatch.setattr(response_cache, "backend", response_cache.LocalBackend(64, 300))
+    assert _reads(client, course.id) == {"primary_reads": 1, "replica_reads": 0}
+
+@pytest.fixture
+def local_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", response_cache.LocalBackend(64, 300))
+
+def test_update_invalidates_cached_course(client, db, local_cache):
+    course = models.Course(code="CS1", title="Intro")
+    db.add(course)
+    db.commit()
+
+    first = client.get(f"/admins/courses/{course.id}")
+    assert first.json()["title"] == "Intro"
+    assert client.get(f"/admins/courses/{course.id}", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    assert client.put(f"/admins/courses/{course.id}", json={"code": "CS1", "title": "Programming"}).status_code == 200
+    assert client.get(f"/admins/courses/{course.id}").json()["title"] == "Programming"
+
+def test_local_backend_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(response_cache.settings, "RESPONSE_CACHE_BACKEND", "local")
+    monkeypatch.setattr(response_cache.settings, "WEB_CONCURRENCY", 4)
+    assert response_cache._create_backend() is None
+    monkeypatch.setattr(response_cache.settings, "WEB_CONCURRENCY", 1)
+    assert isinstance(response_cache._create_backend(), response_cache.LocalBackend)